@@ -0,0 +1,223 @@
+import argparse
+import hashlib
+import json
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from crossword import *
+from creator import CrosswordCreator, save_all
+
+# Vocabulary parsed once per process, and shared by every puzzle it solves
+VOCABULARY = None
+
+
+def load_vocabulary(words_file):
+    """
+    Return the vocabulary for `words_file`, parsing it only on first use.
+    """
+    global VOCABULARY
+    if VOCABULARY is None or VOCABULARY.filename != words_file:
+        VOCABULARY = open_vocabulary(words_file)
+    return VOCABULARY
+
+
+def file_hash(filename):
+    """
+    Return the SHA-256 digest of the contents of a file, in hexadecimal.
+    """
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def structure_files(paths):
+    """
+    Expand a list of structure files and directories into a list of
+    structure files, taking every `structure*.txt` file of each directory.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.startswith("structure") and name.endswith(".txt")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def encode_assignment(assignment):
+    """
+    Convert an assignment into a JSON-compatible list, or None if there
+    is no assignment.
+    """
+    if assignment is None:
+        return None
+    return [
+        {
+            "i": var.i,
+            "j": var.j,
+            "direction": var.direction_name,
+            "length": var.length,
+            "word": word
+        }
+        for var, word in assignment.items()
+    ]
+
+
+def decode_assignment(data):
+    """
+    Convert the output of `encode_assignment` back into an assignment.
+    """
+    if data is None:
+        return None
+    return {
+        Variable(entry["i"], entry["j"], entry["direction"], entry["length"]):
+            entry["word"]
+        for entry in data
+    }
+
+
+class SolutionCache():
+    """
+    On-disk cache of solved assignments, keyed by the pair of
+    (structure hash, word list hash). Puzzles with no solution are cached
+    as None.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        structure_hash, words_hash = key
+        return os.path.join(self.directory, f"{structure_hash}-{words_hash}.json")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def __getitem__(self, key):
+        with open(self.path(key)) as f:
+            return json.load(f)
+
+    def __setitem__(self, key, data):
+        # Write to a temporary file first, so readers never see partial entries
+        path = self.path(key)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+
+def solve_structure(structure, words_file, inference):
+    """
+    Solve one structure with the shared vocabulary, returning the encoded
+    assignment.
+    """
+    crossword = Crossword(structure, load_vocabulary(words_file))
+    creator = CrosswordCreator(crossword, inference=inference)
+    return encode_assignment(creator.solve())
+
+
+def solve_batch(structures, words_file, inference=None, workers=None, cache=None):
+    """
+    Solve every structure in `structures` with the words in `words_file`,
+    in parallel over `workers` processes, skipping puzzles already in `cache`.
+
+    Return a dict from structure file to encoded assignment.
+    """
+    words_hash = file_hash(words_file)
+    results = dict()
+    keys = dict()
+    for structure in structures:
+        key = (file_hash(structure), words_hash)
+        if cache is not None and key in cache:
+            results[structure] = cache[key]
+        else:
+            keys[structure] = key
+
+    # Parse the vocabulary before starting workers, so that forked workers
+    # inherit it rather than parsing it again
+    load_vocabulary(words_file)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=load_vocabulary, initargs=(words_file,)
+    ) as executor:
+        futures = {
+            executor.submit(solve_structure, structure, words_file, inference):
+                structure
+            for structure in keys
+        }
+        for future in as_completed(futures):
+            structure = futures[future]
+            results[structure] = future.result()
+            if cache is not None:
+                cache[keys[structure]] = results[structure]
+
+    return results
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Generate crossword puzzles for many structures."
+    )
+    parser.add_argument("words")
+    parser.add_argument(
+        "structures", nargs="+",
+        help="structure files, or directories of structure*.txt files"
+    )
+    parser.add_argument(
+        "--inference", choices=["none", CrosswordCreator.FORWARD, CrosswordCreator.MAC],
+        default=CrosswordCreator.MAC, help="inference to run after each assignment"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="number of solver processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--cache", default=".crossword-cache",
+        help="directory of cached solutions"
+    )
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_const", const=None,
+        help="solve every structure, ignoring cached solutions"
+    )
+    parser.add_argument(
+        "--output", help="directory in which to save an image of each puzzle"
+    )
+    args = parser.parse_args()
+    inference = None if args.inference == "none" else args.inference
+
+    # Generate crosswords
+    structures = structure_files(args.structures)
+    cache = SolutionCache(args.cache) if args.cache is not None else None
+    results = solve_batch(
+        structures, args.words,
+        inference=inference, workers=args.workers, cache=cache
+    )
+
+    # Print results, in the order the structures were given
+    vocabulary = load_vocabulary(args.words)
+    images = []
+    for structure in structures:
+        print(structure)
+        assignment = decode_assignment(results[structure])
+        if assignment is None:
+            print("No solution.")
+            continue
+        creator = CrosswordCreator(Crossword(structure, vocabulary))
+        creator.print(assignment)
+        if args.output:
+            name = os.path.splitext(os.path.basename(structure))[0]
+            images.append(
+                (creator, assignment, os.path.join(args.output, f"{name}.png"))
+            )
+
+    # Save every image at once
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        save_all(images, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
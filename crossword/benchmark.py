@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from crossword import *
+from creator import CrosswordCreator, Interrupted, create_creator
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Heuristic configurations to measure, by name
+CONFIGURATIONS = {
+    "plain": {"engine": "set"},
+    "forward": {"engine": "set", "inference": CrosswordCreator.FORWARD},
+    "mac": {"engine": "set", "inference": CrosswordCreator.MAC},
+    "mac-unordered": {
+        "engine": "set", "inference": CrosswordCreator.MAC, "ordering": False
+    },
+    "forward-backjump": {
+        "engine": "set", "inference": CrosswordCreator.FORWARD,
+        "backjumping": True, "nogoods": 1000
+    },
+    "bitset-mac": {"engine": "bitset", "inference": CrosswordCreator.MAC},
+}
+
+# Wall times below this many seconds are too noisy to report as regressions
+MIN_TIME = 0.01
+
+# Synthetic grids as (name, height, width, fraction of open cells, seed)
+SYNTHETIC = [
+    ("synthetic-9", 9, 9, 0.6, 1),
+    ("synthetic-13", 13, 13, 0.6, 2),
+    ("synthetic-21", 21, 21, 0.55, 3),
+]
+
+
+def synthetic_structure(height, width, density, seed):
+    """
+    Return the lines of a random crossword structure, with roughly
+    `density` of its cells open.
+    """
+    rng = random.Random(seed)
+    return [
+        "".join("_" if rng.random() < density else "#" for _ in range(width))
+        for _ in range(height)
+    ]
+
+
+def benchmark_cases(directory, words_file):
+    """
+    Return a list of (name, structure file, words file) cases: each bundled
+    structure with its own word list, then synthetic grids written to
+    `directory` and filled from `words_file`.
+    """
+    cases = []
+    for k in range(3):
+        cases.append((
+            f"structure{k}",
+            os.path.join(DATA, f"structure{k}.txt"),
+            os.path.join(DATA, f"words{k}.txt")
+        ))
+    for name, height, width, density, seed in SYNTHETIC:
+        structure = os.path.join(directory, f"{name}.txt")
+        with open(structure, "w") as f:
+            f.write("\n".join(synthetic_structure(height, width, density, seed)))
+        cases.append((name, structure, words_file))
+    return cases
+
+
+def run(structure, words, configuration, node_limit):
+    """
+    Solve one case with one configuration, returning the creator, whether
+    a solution was found (None if the node limit was reached), the time in
+    seconds spent loading the puzzle, and the time in seconds spent solving it.
+    """
+    settings = dict(configuration)
+    engine = settings.pop("engine")
+    start = time.perf_counter()
+    creator = create_creator(Crossword(structure, words), engine, **settings)
+    creator.node_limit = node_limit
+    loaded = time.perf_counter()
+    try:
+        solved = creator.solve() is not None
+    except Interrupted:
+        solved = None
+    elapsed = time.perf_counter() - loaded
+    return creator, solved, loaded - start, elapsed
+
+
+def benchmark(cases, configurations, node_limit):
+    """
+    Run every case with every configuration, and return a list of results.
+    Each run is repeated with allocation tracing to measure peak memory, so
+    that tracing does not distort the wall time.
+    """
+    results = []
+    for name, structure, words in cases:
+        for label, configuration in configurations.items():
+            creator, solved, load_time, elapsed = run(
+                structure, words, configuration, node_limit
+            )
+            tracemalloc.start()
+            run(structure, words, configuration, node_limit)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            result = {
+                "case": name,
+                "configuration": label,
+                "variables": len(creator.crossword.variables),
+                "solved": solved,
+                "load_time": load_time,
+                "wall_time": elapsed,
+                "peak_memory": peak,
+            }
+            result.update(creator.stats)
+            results.append(result)
+            print(
+                f"{name:<14} {label:<17} {str(solved):<6} "
+                f"{elapsed:9.4f}s {creator.stats['nodes']:>8} nodes",
+                file=sys.stderr
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print every result whose wall time or node count grew by more than
+    `threshold` (a ratio) over the matching result in `baseline`.
+    Return the number of regressions found.
+    """
+    previous = {
+        (result["case"], result["configuration"]): result
+        for result in baseline["results"]
+    }
+    regressions = 0
+    for result in results:
+        old = previous.get((result["case"], result["configuration"]))
+        if old is None:
+            continue
+        for metric in ["wall_time", "nodes"]:
+            if metric == "wall_time" and result[metric] < MIN_TIME:
+                continue
+            if old[metric] and result[metric] / old[metric] > threshold:
+                regressions += 1
+                print(
+                    f"{result['case']} {result['configuration']}: {metric} "
+                    f"{old[metric]} -> {result[metric]}"
+                )
+    return regressions
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark the crossword solver.")
+    parser.add_argument(
+        "--words", default=os.path.join(DATA, "words2.txt"),
+        help="word list for the synthetic grids"
+    )
+    parser.add_argument(
+        "--configurations", nargs="+", choices=list(CONFIGURATIONS),
+        default=list(CONFIGURATIONS), help="configurations to measure"
+    )
+    parser.add_argument(
+        "--node-limit", type=int, default=20000,
+        help="give up on a run after this many search nodes"
+    )
+    parser.add_argument(
+        "--output", help="write the results to this JSON file"
+    )
+    parser.add_argument(
+        "--compare",
+        help="JSON results of an earlier version, to check for regressions"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.5,
+        help="slowdown ratio reported as a regression by --compare"
+    )
+    args = parser.parse_args()
+
+    configurations = {name: CONFIGURATIONS[name] for name in args.configurations}
+    with tempfile.TemporaryDirectory() as directory:
+        cases = benchmark_cases(directory, args.words)
+        results = benchmark(cases, configurations, args.node_limit)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "node_limit": args.node_limit,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    # Fail if results regressed against an earlier run
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import bisect
+
+import numpy as np
+
+from creator import CrosswordCreator
+from vocabulary import LETTERS
+
+
+class WordMatrix():
+    """
+    Vocabulary encoded as a matrix of letter codes, one matrix per word length.
+    Row `k` of `letters[n]` holds the codes of the letters of `words[n][k]`.
+    Lengths are encoded on first use, without copying the letters of a
+    compiled vocabulary.
+
+    Letters that fit in a byte are coded by their byte, and any others by
+    the codes after them, in order of first use, so that `size` stays small.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.words = dict()
+        self.letters = dict()
+
+        # Codes of the letters that do not fit in a byte
+        self.extra = dict()
+        self.size = LETTERS
+
+    def domain(self, length):
+        """
+        Return a full domain holding every word of the given length.
+        """
+        if length not in self.words:
+            self.words[length] = self.vocabulary.words_of_length(length)
+            codes = np.asarray(self.vocabulary.letter_block(length))
+            if codes.dtype != np.uint8:
+                codes = self.encode(codes)
+            self.letters[length] = codes.reshape(len(self.words[length]), length)
+        words = self.words[length]
+        return MaskDomain(
+            words, self.letters[length], np.ones(len(words), dtype=bool)
+        )
+
+    def encode(self, points):
+        """
+        Return the array of Unicode code points `points` as letter codes.
+        """
+        points, inverse = np.unique(points, return_inverse=True)
+        codes = []
+        for point in points.tolist():
+            if point >= LETTERS and point not in self.extra:
+                self.extra[point] = LETTERS + len(self.extra)
+            codes.append(self.extra.get(point, point))
+        self.size = LETTERS + len(self.extra)
+        return np.array(codes, dtype=np.uint32)[inverse]
+
+
+class MaskDomain():
+    """
+    Set-like domain of a variable, stored as a boolean mask over the sorted
+    words of one length in a `WordMatrix`.
+    """
+
+    def __init__(self, words, letters, mask):
+        self.words = words
+        self.letters = letters
+        self.mask = mask
+
+    def row(self, word):
+        """Return the row of `word` in the matrix, or None if absent."""
+        k = bisect.bisect_left(self.words, word)
+        if k < len(self.words) and self.words[k] == word:
+            return k
+        return None
+
+    def copy(self):
+        return MaskDomain(self.words, self.letters, self.mask.copy())
+
+    def remove(self, word):
+        k = self.row(word)
+        if k is None or not self.mask[k]:
+            raise KeyError(word)
+        self.mask[k] = False
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    def __iter__(self):
+        for k in np.flatnonzero(self.mask):
+            yield self.words[k]
+
+    def __contains__(self, word):
+        k = self.row(word)
+        return k is not None and bool(self.mask[k])
+
+    def __eq__(self, other):
+        return set(self) == set(other)
+
+    def __str__(self):
+        return str(set(self))
+
+
+class BitsetCrosswordCreator(CrosswordCreator):
+    """
+    Crossword generator that keeps each domain as a mask over a NumPy letter
+    matrix, so that arc revision and value ordering are vectorized.
+    Produces the same domains as the set-based `CrosswordCreator`.
+    """
+
+    def __init__(self, crossword, **settings):
+        super().__init__(crossword, **settings)
+        self.matrix = WordMatrix(self.crossword.vocabulary)
+        self.domains = {
+            var: self.matrix.domain(var.length)
+            for var in self.crossword.variables
+        }
+
+    def enforce_node_consistency(self):
+        """
+        Domains are built from the words of each variable's length, so they
+        are already node-consistent.
+        """
+        return
+
+    def prune(self, var, removed):
+        """
+        Clear the rows set in the boolean mask `removed` from the domain
+        of `var`.
+        """
+        domain = self.domains[var]
+        domain.mask = domain.mask & ~removed
+        self.record(var, removed)
+
+    def restore(self, var, removed):
+        """
+        Set the rows in the boolean mask `removed` back in the domain of `var`.
+        """
+        domain = self.domains[var]
+        domain.mask = domain.mask | removed
+
+    def reduce(self, var, word):
+        """
+        Prune every value but `word` from the domain of `var`.
+        """
+        removed = self.domains[var].mask.copy()
+        removed[self.domains[var].row(word)] = False
+        self.prune(var, removed)
+
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y` by masking out
+        words whose overlapping letter appears in no word of `y`.
+
+        Return True if a revision was made to the domain of `x`; return
+        False if no revision was made.
+        """
+        overlap = self.crossword.crossing_overlaps[x].get(y)
+        if overlap is None:
+            return False
+        idx_x, idx_y = overlap
+        domain_x = self.domains[x]
+        domain_y = self.domains[y]
+
+        # Letters that y can still place at the overlap
+        supported = np.zeros(self.matrix.size, dtype=bool)
+        supported[domain_y.letters[domain_y.mask, idx_y]] = True
+
+        # Keep only words of x whose overlapping letter is supported
+        removed = domain_x.mask & ~supported[domain_x.letters[:, idx_x]]
+        if not removed.any():
+            return False
+        self.prune(x, removed)
+        return True
+
+    def least_constraining(self, var, assignment):
+        """
+        Return the values in the domain of `var`, sorted by the number of
+        values they rule out for unassigned neighbors of `var`.
+        """
+        domain_x = self.domains[var]
+        rows = np.flatnonzero(domain_x.mask)
+        counts = np.zeros(len(rows), dtype=np.int64)
+        for y, idx_x, idx_y in self.crossword.crossings(var):
+            if y in assignment:
+                continue
+            domain_y = self.domains[y]
+
+            # Words of y that agree with each letter at the overlap
+            histogram = np.bincount(
+                domain_y.letters[domain_y.mask, idx_y],
+                minlength=self.matrix.size
+            )
+            counts += len(domain_y) - histogram[domain_x.letters[rows, idx_x]]
+
+        if self.random is not None:
+            tiebreak = list(range(len(rows)))
+            self.random.shuffle(tiebreak)
+            order = np.lexsort((tiebreak, counts))
+        else:
+            order = np.argsort(counts, kind="stable")
+        return [domain_x.words[rows[k]] for k in order]
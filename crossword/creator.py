@@ -0,0 +1,815 @@
+import heapq
+import itertools
+import os
+import random
+import string
+
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from crossword import *
+
+# Size in pixels of each cell in saved images, and of the border around it
+CELL_SIZE = 100
+CELL_BORDER = 2
+
+FONT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "assets", "fonts", "OpenSans-Regular.ttf"
+)
+
+# Tiles of letters drawn in a white cell, rendered once per process
+GLYPHS = dict()
+
+
+def glyph_tile(letter):
+    """
+    Return a grayscale array of `letter` drawn in the interior of a cell.
+    The 26 capital letters are rendered together on first use, and any other
+    character when it is first asked for.
+    """
+    if letter not in GLYPHS:
+        import numpy as np
+        from PIL import Image, ImageDraw, ImageFont
+        font = ImageFont.truetype(FONT_FILE, 80)
+        interior_size = CELL_SIZE - 2 * CELL_BORDER
+        tile_size = interior_size + 1
+        for glyph in set(string.ascii_uppercase + letter) - set(GLYPHS):
+
+            # Draw away from the edge, as in a full image, since fractional
+            # text positions are rounded differently when negative
+            size = tile_size + CELL_SIZE
+            tile = Image.new("L", (size, size), "white")
+            draw = ImageDraw.Draw(tile)
+            _, _, w, h = draw.textbbox((0, 0), glyph, font=font)
+            draw.text(
+                (CELL_SIZE + ((interior_size - w) / 2),
+                 CELL_SIZE + ((interior_size - h) / 2) - 10),
+                glyph, fill="black", font=font
+            )
+            GLYPHS[glyph] = np.asarray(tile)[CELL_SIZE:, CELL_SIZE:]
+    return GLYPHS[letter]
+
+
+def save_all(puzzles, workers=None):
+    """
+    Save many crossword assignments in one pass, given (creator, assignment,
+    filename) triples. Images are rendered in turn and compressed in
+    parallel over `workers` threads.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(creator.render(assignment).save, filename)
+            for creator, assignment, filename in puzzles
+        ]
+        for future in futures:
+            future.result()
+
+
+class Interrupted(Exception):
+    """
+    Raised when `CrosswordCreator.interrupt` asks the search to stop, or
+    when it reaches `CrosswordCreator.node_limit`.
+    """
+
+
+class NogoodStore():
+    """
+    Bounded store of learned nogoods: sets of (variable, word) pairs that
+    cannot all hold in a solution. Once full, the least recently used
+    nogood is forgotten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.nogoods = OrderedDict()
+
+        # Nogoods containing each (variable, word) pair
+        self.watches = dict()
+
+    def __len__(self):
+        return len(self.nogoods)
+
+    def add(self, nogood):
+        """
+        Learn a nogood, forgetting the least recently used one if full.
+        """
+        nogood = frozenset(nogood)
+        if nogood in self.nogoods:
+            self.nogoods.move_to_end(nogood)
+            return
+        self.nogoods[nogood] = None
+        for pair in nogood:
+            self.watches.setdefault(pair, set()).add(nogood)
+
+        while len(self.nogoods) > self.capacity:
+            forgotten, _ = self.nogoods.popitem(last=False)
+            for pair in forgotten:
+                self.watches[pair].discard(forgotten)
+                if not self.watches[pair]:
+                    del self.watches[pair]
+
+    def violated(self, var, word, assignment):
+        """
+        Return a nogood that assigning `word` to `var` would complete,
+        given `assignment`, or None if there is no such nogood.
+        """
+        for nogood in self.watches.get((var, word), ()):
+            if all(
+                assignment.get(y) == value
+                for y, value in nogood if y != var
+            ):
+                self.nogoods.move_to_end(nogood)
+                return nogood
+        return None
+
+
+class CrosswordCreator():
+
+    # Inference performed after each assignment during backtracking
+    FORWARD = "forward"
+    MAC = "mac"
+
+    def __init__(self, crossword, inference=None, ordering=True, seed=None,
+                 backjumping=False, nogoods=0):
+        """
+        Create new CSP crossword generate.
+        `inference` is None, `FORWARD` to prune the domains of unassigned
+        neighbors after each assignment, or `MAC` to maintain arc consistency.
+        `ordering` selects least-constraining-value ordering of domain values;
+        turn it off when ordering costs more than the search it saves.
+        If `seed` is given, values that tie are tried in a random order.
+        `backjumping` makes `solve` use conflict-directed backjumping, which
+        also learns up to `nogoods` nogoods if that is more than zero.
+        """
+        self.crossword = crossword
+        self.inference = inference
+        self.ordering = ordering
+        self.random = random.Random(seed) if seed is not None else None
+        self.backjumping = backjumping
+        self.nogoods = NogoodStore(nogoods) if nogoods > 0 else None
+
+        # Callable polled every 1024 nodes during backtracking; once it
+        # returns True, the search stops by raising `Interrupted`
+        self.interrupt = None
+
+        # Most nodes the search may visit before raising `Interrupted`,
+        # checked at every node
+        self.node_limit = None
+
+        # Domains start from the words of each variable's length, so that
+        # a compiled vocabulary only decodes the lengths that are needed
+        self.domains = {
+            var: set(self.crossword.vocabulary.words_of_length(var.length))
+            for var in self.crossword.variables
+        }
+
+        # Count of words in each domain with a given letter at each position,
+        # built on first use and kept up to date as words are pruned
+        self.supports = dict()
+
+        # Log of (variable, removed words, previous version) entries, so that
+        # inferences made during backtracking can be undone without copying
+        self.trail = []
+
+        # Version of each domain, which changes whenever values are pruned and
+        # is put back on undo, so that equal versions mean equal domains
+        self.versions = dict()
+        self.clock = itertools.count(1)
+
+        # Latest value ordering computed for each variable, with its key
+        self.orderings = dict()
+
+        # Heap of (domain size, -degree, counter, variable) entries used to
+        # pick variables during `solve`; entries whose size no longer matches
+        # the domain, or whose variable is assigned, are skipped when popped
+        self.heap = None
+
+        # Counters describing the work done by the search and AC-3, for profiling
+        self.stats = {
+            "nodes": 0,
+            "revise_calls": 0,
+            "revisions": 0,
+            "pruned": 0,
+            "queue_peak": 0,
+            "backjumps": 0,
+            "nogoods_learned": 0,
+            "nogood_hits": 0,
+        }
+
+        # Variable whose domain was emptied by the last failed inference
+        self.wipeout = None
+
+    def letter_grid(self, assignment):
+        """
+        Return 2D array representing a given assignment.
+        """
+        letters = [
+            [None for _ in range(self.crossword.width)]
+            for _ in range(self.crossword.height)
+        ]
+        for variable, word in assignment.items():
+            for (i, j), letter in zip(variable.cells, word):
+                letters[i][j] = letter
+        return letters
+
+    def print(self, assignment):
+        """
+        Print crossword assignment to the terminal.
+        """
+        letters = self.letter_grid(assignment)
+        for i in range(self.crossword.height):
+            for j in range(self.crossword.width):
+                if self.crossword.structure[i][j]:
+                    print(letters[i][j] or " ", end="")
+                else:
+                    print("█", end="")
+            print()
+
+    def render(self, assignment):
+        """
+        Return an image of a crossword assignment, built by pasting
+        pre-rendered letter tiles into an array.
+        """
+        import numpy as np
+        from PIL import Image
+        letters = self.letter_grid(assignment)
+        tile_size = CELL_SIZE - 2 * CELL_BORDER + 1
+
+        # Grayscale canvas, black except for the white interior of open cells
+        canvas = np.zeros(
+            (self.crossword.height * CELL_SIZE, self.crossword.width * CELL_SIZE),
+            dtype=np.uint8
+        )
+        for i in range(self.crossword.height):
+            for j in range(self.crossword.width):
+                if self.crossword.structure[i][j]:
+                    top = i * CELL_SIZE + CELL_BORDER
+                    left = j * CELL_SIZE + CELL_BORDER
+                    canvas[top:top + tile_size, left:left + tile_size] = (
+                        glyph_tile(letters[i][j]) if letters[i][j] else 255
+                    )
+
+        return Image.fromarray(canvas, "L").convert("RGBA")
+
+    def save(self, assignment, filename):
+        """
+        Save crossword assignment to an image file.
+        """
+        self.render(assignment).save(filename)
+
+    def solve(self):
+        """
+        Enforce node and arc consistency, and then solve the CSP.
+        """
+        self.enforce_node_consistency()
+        self.ac3()
+        self.trail = []
+        self.heap = []
+        for var in self.crossword.variables:
+            self.enqueue(var)
+        if self.backjumping:
+            return self.backjump(dict())[0]
+        return self.backtrack(dict())
+
+    def solutions(self, unique=True):
+        """
+        Enforce node and arc consistency, and then generate every solution of
+        the CSP, resuming the search after each one rather than restarting it.
+        Solutions are generated with chronological backtracking, since
+        backjumping only explains failures.
+
+        If `unique` is True, skip any solution whose letter grid is
+        a rotation or reflection (that keeps the structure unchanged) of
+        the grid of a solution already generated.
+        """
+        self.enforce_node_consistency()
+        self.ac3()
+        self.trail = []
+        self.heap = []
+        for var in self.crossword.variables:
+            self.enqueue(var)
+
+        symmetries = self.crossword.symmetries()
+        seen = set()
+        for assignment in self.search(dict()):
+            if unique:
+                grid = tuple(
+                    tuple(letter or "#" for letter in row)
+                    for row in self.letter_grid(assignment)
+                )
+                canonical = min(transform(grid) for transform in symmetries)
+                if canonical in seen:
+                    continue
+                seen.add(canonical)
+            yield dict(assignment)
+
+    def enforce_node_consistency(self):
+        """
+        Update `self.domains` such that each variable is node-consistent.
+        (Remove any values that are inconsistent with a variable's unary
+         constraints; in this case, the length of the word.)
+        """
+        for variable in self.domains:
+            # Remove every word whose length does not match the variable
+            self.prune(variable, {
+                x for x in self.domains[variable] if len(x) != variable.length
+            })
+
+    def letter_supports(self, var):
+        """
+        Return, for each position in `var`, a mapping from letter to the number
+        of words in the domain of `var` that have that letter at that position.
+        Letters with no supporting words are left out of the mapping.
+        """
+        if var not in self.supports:
+            supports = [dict() for _ in range(var.length)]
+            for word in self.domains[var]:
+                for k, letter in enumerate(word[:var.length]):
+                    supports[k][letter] = supports[k].get(letter, 0) + 1
+            self.supports[var] = supports
+        return self.supports[var]
+
+    def prune(self, var, words):
+        """
+        Remove `words` from the domain of `var`, and update the letter support
+        counts of `var` to match.
+        """
+        self.domains[var] -= words
+        self.record(var, words)
+        supports = self.supports.get(var)
+        if supports is None:
+            return
+        for word in words:
+            for k, letter in enumerate(word[:var.length]):
+                supports[k][letter] -= 1
+                if supports[k][letter] == 0:
+                    del supports[k][letter]
+
+    def record(self, var, removed):
+        """
+        Note that `removed` was pruned from the domain of `var`, giving the
+        domain a new version and logging it on the trail if inference is on.
+        """
+        if self.inference is not None:
+            self.trail.append((var, removed, self.versions.get(var, 0)))
+        self.versions[var] = next(self.clock)
+        self.enqueue(var)
+
+    def restore(self, var, words):
+        """
+        Return previously pruned `words` to the domain of `var`.
+        """
+        self.domains[var] |= words
+        supports = self.supports.get(var)
+        if supports is None:
+            return
+        for word in words:
+            for k, letter in enumerate(word[:var.length]):
+                supports[k][letter] = supports[k].get(letter, 0) + 1
+
+    def enqueue(self, var):
+        """
+        Push `var` onto the variable heap, keyed by its current domain size
+        and degree, if the heap is in use.
+        """
+        if self.heap is None:
+            return
+        heapq.heappush(self.heap, (
+            len(self.domains[var]),
+            -len(self.crossword.neighbors(var)),
+            next(self.clock),
+            var
+        ))
+
+    def reduce(self, var, word):
+        """
+        Prune every value but `word` from the domain of `var`.
+        """
+        self.prune(var, self.domains[var] - {word})
+
+    def undo(self, mark):
+        """
+        Restore every domain pruned since the trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            var, words, version = self.trail.pop()
+            self.restore(var, words)
+            self.versions[var] = version
+            self.enqueue(var)
+
+    def infer(self, var, assignment):
+        """
+        Propagate the assignment of `var` to the domains of its neighbors,
+        according to `self.inference`.
+
+        Return False if some domain becomes empty, otherwise True.
+        """
+        if self.inference is None:
+            return True
+        self.reduce(var, assignment[var])
+        arcs = [
+            (y, var) for y in self.crossword.neighbors(var)
+            if y not in assignment
+        ]
+
+        # Maintain arc consistency, following up on every revision
+        if self.inference == CrosswordCreator.MAC:
+            return self.ac3(arcs)
+
+        # Forward checking only revises the neighbors of `var`
+        for y, x in arcs:
+            if self.revise(y, x) and len(self.domains[y]) == 0:
+                self.wipeout = y
+                return False
+        return True
+
+    def explain(self, var, assignment):
+        """
+        Return a set of assigned variables that accounts for every value
+        inference has pruned from the domain of `var`.
+        """
+        if self.inference is None:
+            return set()
+
+        # Arc consistency can carry a pruning through unassigned variables,
+        # so any assigned variable may be responsible
+        if self.inference == CrosswordCreator.MAC:
+            return set(assignment)
+
+        # Forward checking only prunes the domains of assigned variables' neighbors
+        return {y for y in self.crossword.neighbors(var) if y in assignment}
+
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y`.
+        To do so, remove values from `self.domains[x]` for which there is no
+        possible corresponding value for `y` in `self.domains[y]`.
+
+        Return True if a revision was made to the domain of `x`; return
+        False if no revision was made.
+        """
+        revised = False
+
+        # Get overlaps, if None, can return early
+        overlap = self.crossword.crossing_overlaps[x].get(y)
+        if overlap is None:
+            return revised
+        idx_x, idx_y = overlap
+
+        # Letters of x at the overlap that no word of y can match
+        supports_y = self.letter_supports(y)[idx_y]
+        unsupported = [
+            letter for letter in self.letter_supports(x)[idx_x]
+            if letter not in supports_y
+        ]
+
+        # Look up the words of x holding those letters, rather than comparing
+        # every pair of words
+        removed = set()
+        for letter in unsupported:
+            words = self.crossword.index.get((x.length, idx_x, letter), set())
+            removed |= words & self.domains[x]
+
+        if removed:
+            self.prune(x, removed)
+            revised = True
+
+        return revised
+
+    def ac3(self, arcs=None):
+        """
+        Update `self.domains` such that each variable is arc consistent.
+        If `arcs` is None, begin with initial list of all arcs in the problem.
+        Otherwise, use `arcs` as the initial list of arcs to make consistent.
+
+        Return True if arc consistency is enforced and no domains are empty;
+        return False if one or more domains end up empty.
+        """
+
+        # If provided arcs is empty, initialize queue with all arcs
+        if arcs is None:
+            queue = deque(
+                (x, y)
+                for x in self.crossword.variables
+                for y in self.crossword.neighbors(x)
+            )
+
+        # Otherwise, use the provided arcs as the queue, dropping duplicates
+        else:
+            queue = deque(dict.fromkeys(arcs))
+
+        # Track which arcs are waiting, so that none is queued twice
+        queued = set(queue)
+        stats = self.stats
+        stats["queue_peak"] = max(stats["queue_peak"], len(queue))
+
+        while queue:
+            # Dequeue, get the first arc inserted
+            x, y = queue.popleft()
+            queued.remove((x, y))
+
+            # Check if x should be revised
+            size = len(self.domains[x])
+            stats["revise_calls"] += 1
+            if self.revise(x, y):
+                stats["revisions"] += 1
+                stats["pruned"] += size - len(self.domains[x])
+
+                # If X domain is empty, this problem cannot be resolved
+                if len(self.domains[x]) == 0:
+                    self.wipeout = x
+                    return False
+
+                # Add neighbors that aren't y back into the queue
+                for z in self.crossword.neighbors(x):
+                    if z != y and (z, x) not in queued:
+                        queue.append((z, x))
+                        queued.add((z, x))
+                stats["queue_peak"] = max(stats["queue_peak"], len(queue))
+
+        return True
+
+    def assignment_complete(self, assignment):
+        """
+        Return True if `assignment` is complete (i.e., assigns a value to each
+        crossword variable); return False otherwise.
+        """
+        # Cheap rejection for the common case of a partial assignment
+        if len(assignment) < len(self.crossword.variables):
+            return False
+        for variable in self.crossword.variables:
+            if variable not in assignment:
+                return False
+        return True
+
+    def consistent(self, assignment):
+        """
+        Return True if `assignment` is consistent (i.e., words fit in crossword
+        puzzle without conflicting characters); return False otherwise.
+        """
+        # For each variab;e in the assignment, check that there are no conflicts at the overlaps
+        for x in assignment:
+            word_x = assignment[x]
+
+            # Check that the word is the correct length
+            if len(word_x) != x.length:
+                return False
+
+            # Check for conflicts with neighboring variables
+            for y, idx_x, idx_y in self.crossword.crossings(x):
+                # Only check neighbors that are also assigned
+                if y in assignment:
+                    word_y = assignment[y]
+
+                    # Fails consistency check if characters at overlap do not match
+                    if word_x[idx_x] != word_y[idx_y]:
+                        return False
+        
+        return True
+
+    def consistent_with(self, var, word, assignment):
+        """
+        Return True if assigning `word` to `var` keeps a consistent
+        `assignment` consistent. Only `var` is checked, against its assigned
+        neighbors, and `assignment` is not modified.
+        """
+        # Check that the word is the correct length
+        if len(word) != var.length:
+            return False
+
+        # Check for conflicts with neighboring variables that are assigned
+        for y, idx_x, idx_y in self.crossword.crossings(var):
+            if y in assignment and y != var:
+                if word[idx_x] != assignment[y][idx_y]:
+                    return False
+
+        return True
+
+    def conflicting_neighbors(self, var, word, assignment):
+        """
+        Return the set of assigned neighbors of `var` whose words disagree
+        with `word` at their overlap.
+        """
+        return {
+            y for y, idx_x, idx_y in self.crossword.crossings(var)
+            if y in assignment and y != var
+            and word[idx_x] != assignment[y][idx_y]
+        }
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables.
+        The first value in the list, for example, should be the one
+        that rules out the fewest values among the neighbors of `var`.
+        """
+        if not self.ordering:
+            values = list(self.domains[var])
+            if self.random is not None:
+                self.random.shuffle(values)
+            return values
+
+        # Reuse the last ordering if no domain involved has changed since
+        key = (self.versions.get(var, 0),) + tuple(
+            None if y in assignment else self.versions.get(y, 0)
+            for y in self.crossword.neighbors(var)
+        )
+        cached = self.orderings.get(var)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        values = self.least_constraining(var, assignment)
+        self.orderings[var] = (key, values)
+        return values
+
+    def least_constraining(self, var, assignment):
+        """
+        Return the values in the domain of `var`, sorted by the number of
+        values they rule out for unassigned neighbors of `var`.
+        """
+        # A word rules out every word of y with another letter at the overlap,
+        # which is the domain size less the support count of its own letter
+        neighbors = []
+        for y, idx_x, idx_y in self.crossword.crossings(var):
+            if y in assignment:
+                continue
+            neighbors.append(
+                (idx_x, len(self.domains[y]), self.letter_supports(y)[idx_y])
+            )
+
+        counts = {
+            word: sum(
+                size - supports.get(word[idx_x], 0)
+                for idx_x, size, supports in neighbors
+            )
+            for word in self.domains[var]
+        }
+        values = list(counts)
+        if self.random is not None:
+            self.random.shuffle(values)
+        values.sort(key=counts.get)
+        return values
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return an unassigned variable not already part of `assignment`.
+        Choose the variable with the minimum number of remaining values
+        in its domain. If there is a tie, choose the variable with the highest
+        degree. If there is a tie, any of the tied variables are acceptable
+        return values.
+        """
+        # During `solve`, pop the heap until an up-to-date entry turns up
+        if self.heap is not None:
+
+            # Rebuild the heap once outdated entries dominate it
+            if len(self.heap) > 4 * len(self.crossword.variables):
+                self.heap = []
+                for var in self.crossword.variables:
+                    if var not in assignment:
+                        self.enqueue(var)
+
+            while self.heap:
+                size, _, _, var = heapq.heappop(self.heap)
+                if var not in assignment and size == len(self.domains[var]):
+                    return var
+
+        # Otherwise, scan for the fewest remaining values, then highest degree
+        unassigned = [
+            var for var in self.crossword.variables if var not in assignment
+        ]
+        return min(
+            unassigned,
+            key=lambda v: (len(self.domains[v]), -len(self.crossword.neighbors(v))),
+            default=None
+        )
+
+    def visit(self):
+        """
+        Count a node of the search, stopping the search by raising
+        `Interrupted` if `self.interrupt` asks for it or the node limit
+        has been reached.
+        """
+        if self.node_limit is not None and self.stats["nodes"] >= self.node_limit:
+            raise Interrupted
+        self.stats["nodes"] += 1
+        if self.interrupt is not None and self.stats["nodes"] % 1024 == 0:
+            if self.interrupt():
+                raise Interrupted
+
+    def backtrack(self, assignment):
+        """
+        Using Backtracking Search, take as input a partial assignment for the
+        crossword and return a complete assignment if possible to do so.
+
+        `assignment` is a mapping from variables (keys) to words (values).
+
+        If no assignment is possible, return None.
+        """
+        return next(self.search(assignment), None)
+
+    def search(self, assignment):
+        """
+        Using Backtracking Search, extend a partial assignment and generate
+        each complete assignment reachable from it, in the order they are
+        found. The same `assignment` dict is generated each time, and is
+        modified once the search resumes.
+        """
+        self.visit()
+
+        # First check if the assignment that was provided is already complete
+        if self.assignment_complete(assignment):
+            yield assignment
+            return
+
+        # Get an unnassigned variable
+        variable = self.select_unassigned_variable(assignment)
+
+        # Inference may prune this domain, so loop over a snapshot of it
+        for word in self.order_domain_values(variable, assignment):
+            # The assignment so far is consistent, so only the new word needs checking
+            if self.consistent_with(variable, word, assignment):
+                # If consistent, assig that word to the original
+                assignment[variable] = word
+                mark = len(self.trail)
+                if self.infer(variable, assignment):
+                    # Pass each result up the call heirarchy
+                    yield from self.search(assignment)
+
+                # Then undo the word, so that this line will backtrack
+                self.undo(mark)
+                assignment.pop(variable)
+
+        # Every value failed, so `variable` is unassigned again
+        self.enqueue(variable)
+
+    def backjump(self, assignment):
+        """
+        Using Conflict-Directed Backjumping, take as input a partial assignment
+        for the crossword and return a pair of a complete assignment, or None
+        if no assignment is possible, and a conflict set.
+
+        On failure, the conflict set holds the assigned variables responsible
+        for it, and search jumps straight back to the latest of them rather
+        than retrying variables that had no part in the failure.
+        """
+        self.visit()
+        if self.assignment_complete(assignment):
+            return assignment, set()
+        variable = self.select_unassigned_variable(assignment)
+
+        # Values already pruned from the domain count as conflicts too
+        conflicts = self.explain(variable, assignment)
+
+        for word in self.order_domain_values(variable, assignment):
+            if not self.consistent_with(variable, word, assignment):
+                conflicts |= self.conflicting_neighbors(variable, word, assignment)
+                continue
+
+            # Skip words that would complete a learned nogood
+            if self.nogoods is not None:
+                nogood = self.nogoods.violated(variable, word, assignment)
+                if nogood is not None:
+                    self.stats["nogood_hits"] += 1
+                    conflicts |= {y for y, _ in nogood if y != variable}
+                    continue
+
+            assignment[variable] = word
+            mark = len(self.trail)
+            if self.infer(variable, assignment):
+                result, failure = self.backjump(assignment)
+                if result is not None:
+                    return result, set()
+
+                # The failure below does not involve this variable, so trying
+                # its other words cannot help: jump back further
+                if variable not in failure:
+                    self.stats["backjumps"] += 1
+                    self.undo(mark)
+                    assignment.pop(variable)
+                    self.enqueue(variable)
+                    return None, failure
+                conflicts |= failure - {variable}
+            else:
+                conflicts |= self.explain(self.wipeout, assignment) - {variable}
+
+            self.undo(mark)
+            assignment.pop(variable)
+
+        # No word fits, given the words of the conflicting variables
+        if self.nogoods is not None and conflicts:
+            self.nogoods.add((y, assignment[y]) for y in conflicts)
+            self.stats["nogoods_learned"] += 1
+        self.enqueue(variable)
+        return None, conflicts
+
+
+def create_creator(crossword, engine="set", **settings):
+    """
+    Return a crossword generator for `crossword`, using the set-based or
+    "bitset" domain engine, and passing `settings` on to its constructor.
+    """
+    if engine == "bitset":
+        from bitset import BitsetCrosswordCreator
+        return BitsetCrosswordCreator(crossword, **settings)
+    return CrosswordCreator(crossword, **settings)
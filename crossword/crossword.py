@@ -1,25 +1,57 @@
+from vocabulary import CompiledVocabulary, Vocabulary, open_vocabulary
+
+
 class Variable():
 
-    ACROSS = "across"
-    DOWN = "down"
+    # Directions are stored as small integer codes, named by `NAMES`
+    ACROSS = 0
+    DOWN = 1
+    NAMES = ("across", "down")
+
+    # Variables are immutable, so attributes are fixed slots and
+    # the hash is computed once
+    __slots__ = ("i", "j", "direction", "length", "cells", "hash")
 
     def __init__(self, i, j, direction, length):
-        """Create a new variable with starting point, direction, and length."""
-        self.i = i
-        self.j = j
-        self.direction = direction
-        self.length = length
-        self.cells = []
-        for k in range(self.length):
-            self.cells.append(
-                (self.i + (k if self.direction == Variable.DOWN else 0),
-                 self.j + (k if self.direction == Variable.ACROSS else 0))
-            )
+        """
+        Create a new variable with starting point, direction, and length.
+        `direction` is a direction code, or its name.
+        """
+        if isinstance(direction, str):
+            direction = Variable.NAMES.index(direction)
+        cells = tuple(
+            (i + (k if direction == Variable.DOWN else 0),
+             j + (k if direction == Variable.ACROSS else 0))
+            for k in range(length)
+        )
+        for name, value in [
+            ("i", i), ("j", j), ("direction", direction), ("length", length),
+            ("cells", cells), ("hash", hash((i, j, direction, length)))
+        ]:
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Variable is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Variable is immutable")
+
+    def __reduce__(self):
+        return (Variable, (self.i, self.j, self.direction, self.length))
+
+    @property
+    def direction_name(self):
+        """Name of the direction of the variable."""
+        return Variable.NAMES[self.direction]
 
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self.hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Variable):
+            return NotImplemented
         return (
             (self.i == other.i) and
             (self.j == other.j) and
@@ -28,16 +60,53 @@ class Variable():
         )
 
     def __str__(self):
-        return f"({self.i}, {self.j}) {self.direction} : {self.length}"
+        return f"({self.i}, {self.j}) {self.direction_name} : {self.length}"
 
     def __repr__(self):
-        direction = repr(self.direction)
+        direction = repr(self.direction_name)
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+def grid_transforms():
+    """
+    Return the eight rotations and reflections of a grid, each as a function
+    from a tuple of rows to the transformed tuple of rows.
+    """
+    def rotate(grid):
+        return tuple(zip(*grid[::-1]))
+
+    def reflect(grid):
+        return tuple(row[::-1] for row in grid)
+
+    transforms = []
+    for turns in range(4):
+        for mirror in [False, True]:
+            def transform(grid, turns=turns, mirror=mirror):
+                grid = tuple(tuple(row) for row in grid)
+                for _ in range(turns):
+                    grid = rotate(grid)
+                return reflect(grid) if mirror else grid
+            transforms.append(transform)
+    return transforms
+
+
+class Overlaps(dict):
+    """
+    Mapping from pairs of variables to their overlap, giving None for
+    any pair of variables that do not overlap.
+    """
+
+    def __missing__(self, key):
+        return None
+
+
 class Crossword():
 
     def __init__(self, structure_file, words_file):
+        """
+        Read a crossword structure, and a vocabulary from `words_file`,
+        which is a word list, a compiled vocabulary, or an opened vocabulary.
+        """
 
         # Determine structure of crossword
         with open(structure_file) as f:
@@ -57,9 +126,12 @@ class Crossword():
                         row.append(False)
                 self.structure.append(row)
 
-        # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # Save vocabulary list, reusing it if it was already opened
+        if isinstance(words_file, (Vocabulary, CompiledVocabulary)):
+            self.vocabulary = words_file
+        else:
+            self.vocabulary = open_vocabulary(words_file)
+        self.index = self.vocabulary.index
 
         # Determine variable set
         self.variables = set()
@@ -104,30 +176,60 @@ class Crossword():
                             length=length
                         ))
 
+        # Map each cell to the variables covering it, and the position
+        # of the cell within each of those variables
+        self.cell_variables = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                self.cell_variables.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Only cells shared by two variables are visited, and pairs that
+        # do not overlap are answered by `Overlaps` without being stored.
+        # Each variable also gets its (neighbor, index in variable, index
+        # in neighbor) triples, and its overlaps keyed by neighbor alone
+        self.overlaps = Overlaps()
+        crossings = {var: [] for var in self.variables}
+        for entries in self.cell_variables.values():
+            for v1, k1 in entries:
+                for v2, k2 in entries:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+                        crossings[v1].append((v2, k1, k2))
+        self.crossing_list = dict()
+        self.crossing_overlaps = dict()
+        self.adjacency = dict()
+        for var, triples in crossings.items():
+            self.crossing_list[var] = tuple(triples)
+            self.crossing_overlaps[var] = {y: (k1, k2) for y, k1, k2 in triples}
+            self.adjacency[var] = frozenset(self.crossing_overlaps[var])
+
+    @property
+    def words(self):
+        """Set of every word in the vocabulary."""
+        return self.vocabulary.words
+
+    def symmetries(self):
+        """
+        Return the rotations and reflections of the grid, as functions on
+        tuples of rows, that map the structure onto itself.
+        """
+        structure = tuple(tuple(row) for row in self.structure)
+        return [
+            transform for transform in grid_transforms()
+            if transform(structure) == structure
+        ]
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return self.adjacency[var]
+
+    def crossings(self, var):
+        """
+        Given a variable, return a tuple of (neighbor, index in `var`,
+        index in neighbor) triples, one per overlapping variable.
+        """
+        return self.crossing_list[var]
@@ -1,324 +1,157 @@
+import argparse
+import itertools
+import json
 import sys
 
 from crossword import *
-
-
-class CrosswordCreator():
-
-    def __init__(self, crossword):
-        """
-        Create new CSP crossword generate.
-        """
-        self.crossword = crossword
-        self.domains = {
-            var: self.crossword.words.copy()
-            for var in self.crossword.variables
-        }
-
-    def letter_grid(self, assignment):
-        """
-        Return 2D array representing a given assignment.
-        """
-        letters = [
-            [None for _ in range(self.crossword.width)]
-            for _ in range(self.crossword.height)
-        ]
-        for variable, word in assignment.items():
-            direction = variable.direction
-            for k in range(len(word)):
-                i = variable.i + (k if direction == Variable.DOWN else 0)
-                j = variable.j + (k if direction == Variable.ACROSS else 0)
-                letters[i][j] = word[k]
-        return letters
-
-    def print(self, assignment):
-        """
-        Print crossword assignment to the terminal.
-        """
-        letters = self.letter_grid(assignment)
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-                if self.crossword.structure[i][j]:
-                    print(letters[i][j] or " ", end="")
-                else:
-                    print("█", end="")
-            print()
-
-    def save(self, assignment, filename):
-        """
-        Save crossword assignment to an image file.
-        """
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        interior_size = cell_size - 2 * cell_border
-        letters = self.letter_grid(assignment)
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.crossword.width * cell_size,
-             self.crossword.height * cell_size),
-            "black"
+from creator import CrosswordCreator, Interrupted, create_creator
+
+# Most nodes plain backtracking may visit when measuring the nodes saved by
+# backjumping, so that hard puzzles still finish
+BASELINE_NODES = 1000000
+
+
+def report_stats(creator, settings, engine):
+    """
+    Print the statistics of a finished search to standard error. For
+    backjumping, also run plain backtracking to count the nodes it saved.
+    """
+    for name, value in creator.stats.items():
+        print(f"{name}: {value}", file=sys.stderr)
+    if not creator.backjumping:
+        return
+
+    baseline = create_creator(
+        creator.crossword, engine,
+        **dict(settings, backjumping=False, nogoods=0)
+    )
+    baseline.node_limit = BASELINE_NODES
+    try:
+        baseline.solve()
+        nodes = baseline.stats["nodes"]
+        print(f"backtracking nodes: {nodes}", file=sys.stderr)
+        print(f"nodes saved: {nodes - creator.stats['nodes']}", file=sys.stderr)
+    except Interrupted:
+        nodes = baseline.stats["nodes"]
+        print(f"backtracking nodes: more than {nodes}", file=sys.stderr)
+        print(
+            f"nodes saved: more than {nodes - creator.stats['nodes']}",
+            file=sys.stderr
         )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                if self.crossword.structure[i][j]:
-                    draw.rectangle(rect, fill="white")
-                    if letters[i][j]:
-                        _, _, w, h = draw.textbbox((0, 0), letters[i][j], font=font)
-                        draw.text(
-                            (rect[0][0] + ((interior_size - w) / 2),
-                             rect[0][1] + ((interior_size - h) / 2) - 10),
-                            letters[i][j], fill="black", font=font
-                        )
-
-        img.save(filename)
-
-    def solve(self):
-        """
-        Enforce node and arc consistency, and then solve the CSP.
-        """
-        self.enforce_node_consistency()
-        self.ac3()
-        return self.backtrack(dict())
-
-    def enforce_node_consistency(self):
-        """
-        Update `self.domains` such that each variable is node-consistent.
-        (Remove any values that are inconsistent with a variable's unary
-         constraints; in this case, the length of the word.)
-        """
-        for variable in self.domains:
-            # Copy words before modifying set
-            words = self.domains[variable].copy()
-            for x in words:
-                # Verify that the length of this word is consistent with spec
-                if len(x) != variable.length:
-                    self.domains[variable].remove(x)
-
-    def revise(self, x, y):
-        """
-        Make variable `x` arc consistent with variable `y`.
-        To do so, remove values from `self.domains[x]` for which there is no
-        possible corresponding value for `y` in `self.domains[y]`.
-
-        Return True if a revision was made to the domain of `x`; return
-        False if no revision was made.
-        """
-        revised = False
-
-        # Get overlaps, if None, can return early
-        overlap = self.crossword.overlaps.get((x, y))
-        if overlap is None:
-            return revised
-        idx_x, idx_y = overlap
-
-        # Copy words before modifying set
-        words = self.domains[x].copy()
-
-        # Determine which words in x that have at least one possible match in y
-        for word_x in words:
-            char_x = word_x[idx_x] # Character at the overlap index
-            has_match = False
-
-            # Search all words in y for a match at the overlap index
-            for word_y in self.domains[y]:
-                if char_x == word_y[idx_y]:
-                    # If a match was found, this word_x is valid, break out
-                    has_match = True
-                    break
-
-            # If we did not find a match, then we should revise
-            if not has_match:
-                self.domains[x].remove(word_x)
-                revised = True
-            
-        return revised
- 
-    def ac3(self, arcs=None):
-        """
-        Update `self.domains` such that each variable is arc consistent.
-        If `arcs` is None, begin with initial list of all arcs in the problem.
-        Otherwise, use `arcs` as the initial list of arcs to make consistent.
-
-        Return True if arc consistency is enforced and no domains are empty;
-        return False if one or more domains end up empty.
-        """
-
-        # If provided arcs is empty, initialize queue with all arcs
-        if arcs is None:
-            queue = []
-            for x in self.crossword.variables:
-                for y in self.crossword.neighbors(x):
-                    queue.append((x, y))
 
-        # Otherwise, use the provided arcs as the queue
-        else:
-            queue = arcs.copy()
 
-        while len(queue) > 0:
-            # Dequeue, get the first arc inserted    
-            x, y = queue.pop(0)
-
-            # Check if x should be revised
-            if self.revise(x, y):
-
-                # If X domain is empty, this problem cannot be resolved
-                if len(self.domains[x]) == 0:
-                    return False
-                
-                # Add neighbors that aren't y back into the queue
-                for z in self.crossword.neighbors(x):
-                    if z != y:
-                        queue.append((z, x))
-
-        return True
-
-    def assignment_complete(self, assignment):
-        """
-        Return True if `assignment` is complete (i.e., assigns a value to each
-        crossword variable); return False otherwise.
-        """
-        for variable in self.crossword.variables:
-            if variable not in assignment:
-                return False
-        return True
-
-    def consistent(self, assignment):
-        """
-        Return True if `assignment` is consistent (i.e., words fit in crossword
-        puzzle without conflicting characters); return False otherwise.
-        """
-        # For each variab;e in the assignment, check that there are no conflicts at the overlaps
-        for x in assignment:
-            word_x = assignment[x]
-
-            # Check that the word is the correct length
-            if len(word_x) != x.length:
-                return False
-
-            # Check for conflicts with neighboring variables
-            for y in self.crossword.neighbors(x):
-                # Only check neighbors that are also assigned
-                if y in assignment:
-                    word_y = assignment[y]
-
-                    # We know x,y has an overlap because it is a neighbor
-                    idx_x, idx_y = self.crossword.overlaps.get((x, y))
-
-                    # Fails consistency check if characters at overlap do not match
-                    if word_x[idx_x] != word_y[idx_y]:
-                        return False
-        
-        return True
-
-    def order_domain_values(self, var, assignment):
-        """
-        Return a list of values in the domain of `var`, in order by
-        the number of values they rule out for neighboring variables.
-        The first value in the list, for example, should be the one
-        that rules out the fewest values among the neighbors of `var`.
-        """
-        counts = {word: 0 for word in self.domains[var]}
-        for word_x in counts:
-            for y in self.crossword.neighbors(var):
-                if y not in assignment:
-                    pass
-
-                # We know x,y has an overlap because it is a neighbor
-                idx_x, idx_y = self.crossword.overlaps.get((var, y))
-
-                # Check each available word in y, if its ruled out, increment count
-                for word_y in self.domains[y]:
-                    if word_x[idx_x] != word_y[idx_y]:
-                        counts[word_x] += 1
-        
-        return sorted(list(counts.keys()), key=lambda w: counts[w])
-
-    def select_unassigned_variable(self, assignment):
-        """
-        Return an unassigned variable not already part of `assignment`.
-        Choose the variable with the minimum number of remaining values
-        in its domain. If there is a tie, choose the variable with the highest
-        degree. If there is a tie, any of the tied variables are acceptable
-        return values.
-        """
-        # Sort by the minimum number of remaining values
-        sorted_by_min_remaining = sorted(
-            self.crossword.variables, 
-            key=lambda v: len(self.domains[v])
+def print_solutions(creator, count):
+    """
+    Print up to `count` distinct solutions, or all of them if `count` is 0,
+    one JSON object per line as soon as each is found.
+    """
+    from batch import encode_assignment
+    solutions = creator.solutions()
+    if count:
+        solutions = itertools.islice(solutions, count)
+    for assignment in solutions:
+        grid = [
+            "".join(letter or "#" for letter in row)
+            for row in creator.letter_grid(assignment)
+        ]
+        print(
+            json.dumps({"grid": grid, "assignment": encode_assignment(assignment)}),
+            flush=True
         )
 
-        # Find the first that is not already assigned, and return it
-        for variable in sorted_by_min_remaining:
-            if variable not in assignment:
-                return variable
-
-    def backtrack(self, assignment):
-        """
-        Using Backtracking Search, take as input a partial assignment for the
-        crossword and return a complete assignment if possible to do so.
-
-        `assignment` is a mapping from variables (keys) to words (values).
-
-        If no assignment is possible, return None.
-        """
-        # First check if the assignment that was provided is already complete
-        if self.assignment_complete(assignment):
-            return assignment
-        
-        # Get an unnassigned variable
-        variable = self.select_unassigned_variable(assignment)
-        for word in self.domains[variable]:
-            # We need to copy the assignment to check consistency
-            assignment_copy = assignment.copy()
-            assignment_copy[variable] = word
-            if self.consistent(assignment_copy):
-                # If consistent, assig that word to the original
-                assignment[variable] = word
-                result = self.backtrack(assignment)
-
-                # If we got a result, return that up the call heirarchy
-                if result is not None:
-                    return result
-                
-                # Otherwise, there was not a possible result, so this line will backtrack
-                assignment.pop(variable)
 
 def main():
 
-    # Check usage
-    if len(sys.argv) not in [3, 4]:
-        sys.exit("Usage: python generate.py structure words [output]")
-
     # Parse command-line arguments
-    structure = sys.argv[1]
-    words = sys.argv[2]
-    output = sys.argv[3] if len(sys.argv) == 4 else None
+    parser = argparse.ArgumentParser(description="Generate a crossword puzzle.")
+    parser.add_argument("structure")
+    parser.add_argument("words")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument(
+        "--inference", choices=["none", CrosswordCreator.FORWARD, CrosswordCreator.MAC],
+        default="none", help="inference to run after each assignment"
+    )
+    parser.add_argument(
+        "--engine", choices=["set", "bitset"], default="set",
+        help="domain representation used by the solver"
+    )
+    parser.add_argument(
+        "--no-ordering", dest="ordering", action="store_false",
+        help="try domain values without least-constraining-value ordering"
+    )
+    parser.add_argument(
+        "--backjump", action="store_true",
+        help="search with conflict-directed backjumping"
+    )
+    parser.add_argument(
+        "--nogoods", type=int, default=0,
+        help="with --backjump, learn and keep up to this many nogoods"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="race this many solver processes: the first with the settings "
+        "given, the others each with their own heuristics"
+    )
+    parser.add_argument(
+        "--count", type=int, default=None,
+        help="print up to this many distinct solutions as JSON lines"
+    )
+    parser.add_argument(
+        "--all", dest="count", action="store_const", const=0,
+        help="print every distinct solution as JSON lines"
+    )
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="print solver statistics to standard error"
+    )
+    args = parser.parse_args()
+    inference = None if args.inference == "none" else args.inference
+    if args.workers > 1 and args.count is not None:
+        parser.error("--count and --all search in a single process, not with --workers")
+
+    settings = {
+        "inference": inference,
+        "ordering": args.ordering,
+        "backjumping": args.backjump,
+        "nogoods": args.nogoods,
+    }
 
     # Generate crossword
-    crossword = Crossword(structure, words)
-    creator = CrosswordCreator(crossword)
-    assignment = creator.solve()
+    if args.workers > 1:
+        from batch import load_vocabulary
+        from portfolio import solve_portfolio
+        assignment, worker, stats = solve_portfolio(
+            args.structure, args.words, args.workers,
+            engine=args.engine, settings=settings
+        )
+        if args.stats:
+            print(f"worker: {worker}", file=sys.stderr)
+            for name, value in stats.items():
+                print(f"{name}: {value}", file=sys.stderr)
+
+        # Workers solve their own crosswords, so this one only prints the
+        # result, with the vocabulary already parsed for the workers
+        crossword = Crossword(args.structure, load_vocabulary(args.words))
+        creator = CrosswordCreator(crossword)
+    else:
+        crossword = Crossword(args.structure, args.words)
+        creator = create_creator(crossword, args.engine, **settings)
+        if args.count is not None:
+            print_solutions(creator, args.count)
+            if args.stats:
+                report_stats(creator, settings, args.engine)
+            return
+        assignment = creator.solve()
+        if args.stats:
+            report_stats(creator, settings, args.engine)
 
     # Print result
     if assignment is None:
         print("No solution.")
     else:
         creator.print(assignment)
-        if output:
-            creator.save(assignment, output)
+        if args.output:
+            creator.save(assignment, args.output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import multiprocessing
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from batch import load_vocabulary
+from crossword import *
+from creator import CrosswordCreator, Interrupted, create_creator
+
+# Heuristic mixes given to successive workers; once every mix is in use,
+# further workers repeat them with a different value-ordering seed
+CONFIGURATIONS = [
+    {"inference": CrosswordCreator.MAC, "ordering": True},
+    {"inference": CrosswordCreator.FORWARD, "ordering": True},
+    {"inference": CrosswordCreator.MAC, "ordering": False},
+    {"inference": None, "ordering": True},
+]
+
+
+def worker_settings(k, settings=None):
+    """
+    Return the keyword arguments for the `CrosswordCreator` of worker `k`.
+    If `settings` are given, worker 0 uses them, and the other workers
+    take the mixes in turn.
+    """
+    if settings is not None:
+        if k == 0:
+            return dict(settings, seed=None)
+        k -= 1
+    mix = dict(CONFIGURATIONS[k % len(CONFIGURATIONS)])
+    mix["seed"] = None if k < len(CONFIGURATIONS) else k
+    return mix
+
+
+def solve_worker(structure, words, k, cancel, engine="set", settings=None):
+    """
+    Solve the crossword with the settings of worker `k`, giving up once the
+    `cancel` event is set.
+
+    Return a pair of the assignment found, None if there is no solution, or
+    `Interrupted` if the worker was cancelled, and the statistics of the
+    worker's search.
+    """
+    crossword = Crossword(structure, load_vocabulary(words))
+    creator = create_creator(crossword, engine, **worker_settings(k, settings))
+    creator.interrupt = cancel.is_set
+    try:
+        return creator.solve(), creator.stats
+    except Interrupted:
+        return Interrupted, creator.stats
+
+
+def solve_portfolio(structure, words, workers, engine="set", settings=None):
+    """
+    Race `workers` solver processes, each with its own heuristic mix or seed,
+    on the same crossword. If `settings` are given, the first worker uses
+    them.
+
+    Every worker searches exhaustively, so the first one to finish decides
+    the answer: return its assignment, or None if there is no solution,
+    along with the number of that worker and the statistics of its search.
+    The remaining workers are then cancelled.
+    """
+
+    # Parse the vocabulary before starting workers, so that forked workers
+    # inherit it rather than parsing it again
+    load_vocabulary(words)
+    with multiprocessing.Manager() as manager:
+        cancel = manager.Event()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=load_vocabulary, initargs=(words,)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    solve_worker, structure, words, k, cancel, engine, settings
+                ): k
+                for k in range(workers)
+            }
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            result, stats = future.result()
+
+            # Stop the other workers, whether or not they have started
+            cancel.set()
+            for other in pending:
+                other.cancel()
+
+    return result, futures[future], stats
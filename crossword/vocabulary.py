@@ -0,0 +1,275 @@
+import argparse
+import mmap
+import struct
+
+from array import array
+
+# Compiled vocabulary files start with this marker
+MAGIC = b"XWORDVC1"
+
+# File header: marker and number of word lengths
+HEADER = struct.Struct("=8sI")
+
+# One entry per word length: length, word count, and the offsets of the
+# words block and the index block
+BUCKET = struct.Struct("=IIQQ")
+
+# Number of distinct letter codes, each letter being stored as one byte
+LETTERS = 256
+
+
+class Vocabulary():
+    """
+    Word list read from a file, which can be shared by many crosswords.
+    """
+
+    def __init__(self, words_file):
+        self.filename = words_file
+        with open(words_file) as f:
+            self.words = set(f.read().upper().splitlines())
+
+        # Index vocabulary by (length, position, letter)
+        # so that words sharing a letter at a position can be looked up directly
+        self.index = WordIndex(self)
+
+        # Sorted words of each length, grouped on first use
+        self.lengths = dict()
+
+    def words_of_length(self, length):
+        """
+        Return the sorted list of words with the given length.
+        """
+        if length not in self.lengths:
+            self.lengths[length] = sorted(
+                word for word in self.words if len(word) == length
+            )
+        return self.lengths[length]
+
+    def letter_block(self, length):
+        """
+        Return a view of the letter codes of `words_of_length(length)`, with
+        `length` codes per word: one byte per letter if every letter fits in
+        one, and otherwise one unsigned 32-bit code point per letter.
+        """
+        letters = "".join(self.words_of_length(length))
+        try:
+            return memoryview(letters.encode("latin-1"))
+        except UnicodeEncodeError:
+            return memoryview(letters.encode("utf-32-le")).cast("I")
+
+
+class WordIndex():
+    """
+    Read-only mapping from (length, position, letter) to the set of words
+    with that letter at that position, built for each word length of a
+    `Vocabulary` on first lookup.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.cache = dict()
+        self.lengths = set()
+
+    def get(self, key, default=None):
+        length = key[0]
+        if length not in self.lengths:
+            self.lengths.add(length)
+            for word in self.vocabulary.words_of_length(length):
+                for k, letter in enumerate(word):
+                    self.cache.setdefault((length, k, letter), set()).add(word)
+        return self.cache.get(key, default)
+
+    def __getitem__(self, key):
+        words = self.get(key)
+        if words is None:
+            raise KeyError(key)
+        return words
+
+
+class CompiledIndex():
+    """
+    Read-only mapping from (length, position, letter) to the set of words
+    with that letter at that position, decoded from a compiled vocabulary
+    on first lookup.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.cache = dict()
+
+    def get(self, key, default=None):
+        if key not in self.cache:
+            length, position, letter = key
+            code = ord(letter)
+            if length not in self.vocabulary.buckets or position >= length \
+                    or code >= LETTERS:
+                return default
+            count, _, index_offset = self.vocabulary.buckets[length]
+
+            # Rows holding each letter are stored contiguously, delimited by
+            # a table of LETTERS + 1 offsets for every position
+            start = index_offset + position * 4 * (LETTERS + 1 + count)
+            offsets = self.vocabulary.uint32(start, LETTERS + 1)
+            rows = self.vocabulary.uint32(
+                start + 4 * (LETTERS + 1) + 4 * offsets[code],
+                offsets[code + 1] - offsets[code]
+            )
+            if not rows:
+                return default
+            words = self.vocabulary.words_of_length(length)
+            self.cache[key] = {words[row] for row in rows}
+        return self.cache[key]
+
+    def __getitem__(self, key):
+        words = self.get(key)
+        if words is None:
+            raise KeyError(key)
+        return words
+
+
+class CompiledVocabulary():
+    """
+    Word list stored by `compile_vocabulary`, and opened with `mmap` so that
+    startup does not depend on the size of the vocabulary, and processes
+    reading the same file share its pages.
+
+    Words are decoded only for the lengths that are asked for.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, bucket_count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a compiled vocabulary")
+        self.buckets = dict()
+        for k in range(bucket_count):
+            length, count, words_offset, index_offset = BUCKET.unpack_from(
+                self.buffer, HEADER.size + k * BUCKET.size
+            )
+            self.buckets[length] = (count, words_offset, index_offset)
+
+        self.index = CompiledIndex(self)
+        self.lengths = dict()
+        self.all_words = None
+
+    @property
+    def words(self):
+        """
+        Set of every word in the vocabulary. Decoding every word defeats the
+        purpose of compiling, so solvers should use `words_of_length`.
+        """
+        if self.all_words is None:
+            self.all_words = set()
+            for length in self.buckets:
+                self.all_words.update(self.words_of_length(length))
+        return self.all_words
+
+    def uint32(self, offset, count):
+        """
+        Return a view of `count` unsigned 32-bit integers at `offset`.
+        """
+        return memoryview(self.buffer)[offset:offset + 4 * count].cast("I")
+
+    def letter_block(self, length):
+        """
+        Return a view of the letters of `words_of_length(length)`, with
+        `length` bytes per word.
+        """
+        if length not in self.buckets:
+            return memoryview(b"")
+        count, words_offset, _ = self.buckets[length]
+        return memoryview(self.buffer)[words_offset:words_offset + count * length]
+
+    def words_of_length(self, length):
+        """
+        Return the sorted list of words with the given length.
+        """
+        if length not in self.lengths:
+            block = bytes(self.letter_block(length)).decode("latin-1")
+            self.lengths[length] = [
+                block[k:k + length] for k in range(0, len(block), length)
+            ]
+        return self.lengths[length]
+
+
+def compile_vocabulary(words_file, output):
+    """
+    Write the words of `words_file` to `output` in the compiled format:
+    a header, then for each word length, a block of fixed-width words in
+    sorted order followed by an index of the rows holding each letter at each
+    position. Words that cannot be stored one byte per letter are skipped.
+    """
+    vocabulary = Vocabulary(words_file)
+    lengths = dict()
+    for word in vocabulary.words:
+        try:
+            word.encode("latin-1")
+        except UnicodeEncodeError:
+            continue
+        lengths.setdefault(len(word), []).append(word)
+    for words in lengths.values():
+        words.sort()
+
+    # Lay out the blocks after the header and bucket table
+    offset = HEADER.size + BUCKET.size * len(lengths)
+    buckets = []
+    for length in sorted(lengths):
+        count = len(lengths[length])
+        words_offset = offset
+        index_offset = words_offset + count * length
+        index_offset += -index_offset % 4
+        offset = index_offset + 4 * length * (LETTERS + 1 + count)
+        buckets.append((length, count, words_offset, index_offset))
+
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(buckets)))
+        for bucket in buckets:
+            f.write(BUCKET.pack(*bucket))
+        for length, count, words_offset, index_offset in buckets:
+            words = lengths[length]
+            f.write(b"\0" * (words_offset - f.tell()))
+            f.write("".join(words).encode("latin-1"))
+            f.write(b"\0" * (index_offset - f.tell()))
+            for position in range(length):
+
+                # Group rows by letter, recording where each letter starts
+                rows = sorted(range(count), key=lambda row: words[row][position])
+                offsets = array("I", [0] * (LETTERS + 1))
+                for row in rows:
+                    offsets[ord(words[row][position]) + 1] += 1
+                for code in range(LETTERS):
+                    offsets[code + 1] += offsets[code]
+                f.write(offsets.tobytes())
+                f.write(array("I", rows).tobytes())
+
+
+def open_vocabulary(words_file):
+    """
+    Open `words_file` as a `CompiledVocabulary` if it was compiled, or
+    otherwise read it as a plain `Vocabulary`.
+    """
+    with open(words_file, "rb") as f:
+        compiled = f.read(len(MAGIC)) == MAGIC
+    if compiled:
+        return CompiledVocabulary(words_file)
+    return Vocabulary(words_file)
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Compile a word list for fast loading by generate.py."
+    )
+    parser.add_argument("words")
+    parser.add_argument("output")
+    args = parser.parse_args()
+
+    compile_vocabulary(args.words, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,245 @@
 import itertools
 import random
 
+from collections import deque
+
+import numpy as np
+
+# Shared result for sentences with nothing known, to avoid building empty sets
+EMPTY = frozenset()
+
+def neighbor_counts(board):
+    """
+    Returns an array holding, for each cell of a boolean board, the number of
+    True cells within one row and column of it, not including the cell itself.
+    """
+    # Convolve with a 3x3 kernel of ones, by summing the 9 shifted
+    # windows of the board padded with a border of zeros
+    height, width = board.shape
+    padded = np.pad(board, 1).astype(np.uint8)
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for di in range(3):
+        for dj in range(3):
+            counts += padded[di:di + height, dj:dj + width]
+    return counts - board
+
+
+def mine_configurations(cells, sentences):
+    """
+    Generates every assignment of mines to the list of `cells` that agrees
+    with `sentences`, as a tuple of booleans in the order of `cells`.
+    """
+    position = {cell: k for k, cell in enumerate(cells)}
+    n = len(cells)
+
+    # Mines still needed and cells still unassigned in each sentence
+    needed = [sentence.count for sentence in sentences]
+    remaining = [len(sentence) for sentence in sentences]
+    members = [[] for _ in cells]
+    for s, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            members[position[cell]].append(s)
+
+    def assign(k, mine, sign):
+        for s in members[k]:
+            remaining[s] -= sign
+            if mine:
+                needed[s] -= sign
+
+    # Depth-first search without recursion, since components can be large
+    values = [False] * n
+    tried = [0] * n
+    k = 0
+    while True:
+        if k == n:
+            yield tuple(values)
+            k -= 1
+            if k < 0:
+                return
+            assign(k, values[k], -1)
+            continue
+
+        # Once both values were tried, go back to the previous cell
+        if tried[k] == 2:
+            tried[k] = 0
+            k -= 1
+            if k < 0:
+                return
+            assign(k, values[k], -1)
+            continue
+        mine = tried[k] == 1
+        tried[k] += 1
+
+        # Keep the value if every sentence of the cell can still be satisfied
+        assign(k, mine, 1)
+        if all(0 <= needed[s] <= remaining[s] for s in members[k]):
+            values[k] = mine
+            k += 1
+        else:
+            assign(k, mine, -1)
+
+
+def sample_configurations(cells, sentences, samples, rng=random):
+    """
+    Returns a list of `samples` assignments of mines to the list of `cells`
+    that agree with `sentences`, each drawn uniformly from all of them.
+
+    Cells are assigned in order, and the assignments of the first cells are
+    grouped by the mines each sentence still needs, which is all that the
+    later cells depend on. Counting the assignments in each group lets every
+    sample be drawn from the last cell back, choosing each cell's value in
+    proportion to the number of assignments that lead to it.
+    """
+    position = {cell: k for k, cell in enumerate(cells)}
+    members = [[] for _ in cells]
+    for s, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            members[position[cell]].append(s)
+
+    # Number of assignments of the first k cells that leave each tuple of
+    # mines needed by the sentences, for every k
+    layers = [{tuple(sentence.count for sentence in sentences): 1}]
+    remaining = [len(sentence) for sentence in sentences]
+    for k in range(len(cells)):
+        for s in members[k]:
+            remaining[s] -= 1
+        layer = dict()
+        for needed, count in layers[-1].items():
+            if all(needed[s] <= remaining[s] for s in members[k]):
+                layer[needed] = layer.get(needed, 0) + count
+            if all(needed[s] > 0 for s in members[k]):
+                mined = list(needed)
+                for s in members[k]:
+                    mined[s] -= 1
+                mined = tuple(mined)
+                layer[mined] = layer.get(mined, 0) + count
+        layers.append(layer)
+
+    # Every complete assignment leaves no mine needed, so the last layer
+    # holds a single group, or none if no assignment agrees
+    if not layers[-1]:
+        return []
+    configurations = []
+    for _ in range(samples):
+        needed = next(iter(layers[-1]))
+        values = [False] * len(cells)
+        for k in range(len(cells) - 1, -1, -1):
+            safe = layers[k].get(needed, 0)
+            mined = list(needed)
+            for s in members[k]:
+                mined[s] += 1
+            mined = tuple(mined)
+            mine = layers[k].get(mined, 0)
+            if rng.randrange(safe + mine) < mine:
+                values[k] = True
+                needed = mined
+        configurations.append(tuple(values))
+    return configurations
+
+
+def frontier_components(sentences):
+    """
+    Splits `sentences` into groups that share no cell, and returns a list of
+    (cells, sentences) pairs, one per group. Cells are listed in breadth-first
+    order, so that sentences are completed early during enumeration.
+    """
+    by_cell = dict()
+    for sentence in sentences:
+        for cell in sentence.cells:
+            by_cell.setdefault(cell, []).append(sentence)
+
+    components = []
+    visited = set()
+    for start in by_cell:
+        if start in visited:
+            continue
+        cells = [start]
+        group = dict()
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for sentence in by_cell[cell]:
+                if id(sentence) in group:
+                    continue
+                group[id(sentence)] = sentence
+                for other in sentence.cells:
+                    if other not in visited:
+                        visited.add(other)
+                        cells.append(other)
+                        queue.append(other)
+        components.append((cells, list(group.values())))
+    return components
+
 
 class Minesweeper():
     """
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, deferred=False):
+        """
+        Create a board with `mines` mines placed at random. If `deferred` is
+        True, mines are only placed when a cell is first looked at, and kept
+        away from that cell and, when there is room, from its neighbors, so
+        that the first click is always safe.
+        """
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
+        self.mine_count = mines
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
-
-        # At first, player has found no mines
+        self.board = np.zeros((height, width), dtype=bool)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        self.mine_set = set()
+        self.placed = False
+
+        # Add mines randomly, unless waiting for the first click
+        if not deferred:
+            self.place_mines()
+
+        # At first, player has found no mines, and no cell is revealed
         self.mines_found = set()
+        self.revealed = np.zeros((height, width), dtype=bool)
+
+    def place_mines(self, cell=None):
+        """
+        Places the mines at random, drawing them without replacement from
+        the linear indices of the board. If `cell` is given, it is left free
+        of mines, and so are its neighbors if there are enough other cells.
+        """
+        allowed = np.ones((self.height, self.width), dtype=bool)
+        if cell is not None:
+            i, j = cell
+            allowed[max(i - 1, 0):i + 2, max(j - 1, 0):j + 2] = False
+            if np.count_nonzero(allowed) < self.mine_count:
+                allowed[:] = True
+                allowed[i, j] = False
+        candidates = np.flatnonzero(allowed)
+        if self.mine_count > len(candidates):
+            raise ValueError("too many mines for the board")
+
+        # Seed NumPy from `random`, so that seeding `random` fixes the board
+        rng = np.random.default_rng(random.getrandbits(64))
+        board = np.zeros(self.height * self.width, dtype=bool)
+        board[rng.choice(candidates, self.mine_count, replace=False)] = True
+        self.board = board.reshape(self.height, self.width)
+
+        # Count the mines around every cell at once
+        self.counts = neighbor_counts(self.board)
+        self.mine_set = None
+        self.placed = True
+
+    @property
+    def mines(self):
+        """
+        Set of the cells holding mines, built on first use.
+        """
+        if self.mine_set is None:
+            self.mine_set = set(map(tuple, np.argwhere(self.board).tolist()))
+        return self.mine_set
 
     def print(self):
         """
@@ -41,7 +249,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -49,8 +257,10 @@ class Minesweeper():
         print("--" * self.width + "-")
 
     def is_mine(self, cell):
+        if not self.placed:
+            self.place_mines(cell)
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -58,30 +268,97 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        if not self.placed:
+            self.place_mines(cell)
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def reveal(self, cell):
+        """
+        Reveals a cell, and every cell reached from it through cells with
+        no nearby mines, as the board does when an empty cell is clicked.
+        Returns a list of (cell, nearby mines) pairs for the cells revealed
+        that were not revealed before, or None if `cell` is a mine.
+        """
+        if self.is_mine(cell):
+            return None
+        if self.revealed[cell]:
+            return []
+
+        # Breadth-first search, expanding only from cells with a count of 0,
+        # whose neighbors can never be mines
+        self.revealed[cell] = True
+        revealed = []
+        queue = deque([cell])
+        while queue:
+            i, j = queue.popleft()
+            count = int(self.counts[i, j])
+            revealed.append(((i, j), count))
+            if count:
+                continue
+            for ni in range(max(i - 1, 0), min(i + 2, self.height)):
+                for nj in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if not self.revealed[ni, nj]:
+                        self.revealed[ni, nj] = True
+                        queue.append((ni, nj))
+        return revealed
 
-        # Keep count of nearby mines
-        count = 0
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        No game is won before its mines are placed.
+        """
+        return self.placed and self.mines_found == self.mines
 
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
 
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+class CellPool():
+    """
+    Set of cells of a board, supporting removal and uniform sampling
+    in constant time. Cells are kept in an array by their linear index,
+    and a removed cell is replaced by the last one in the array.
+    """
 
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+    def __init__(self, height, width):
+        self.width = width
+        self.cells = list(range(height * width))
 
-        return count
+        # Position of each cell in `self.cells`, or -1 once it is removed
+        self.positions = list(range(height * width))
 
-    def won(self):
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        i, j = cell
+        return self.positions[i * self.width + j] >= 0
+
+    def discard(self, cell):
         """
-        Checks if all mines have been flagged.
+        Removes a cell from the pool, if it is present.
+        """
+        i, j = cell
+        index = i * self.width + j
+        position = self.positions[index]
+        if position < 0:
+            return
+        last = self.cells.pop()
+        if last != index:
+            self.cells[position] = last
+            self.positions[last] = position
+        self.positions[index] = -1
+
+    def sample(self):
+        """
+        Returns a cell chosen uniformly at random from the pool,
+        or None if the pool is empty.
         """
-        return self.mines_found == self.mines
+        if not self.cells:
+            return None
+        return divmod(random.choice(self.cells), self.width)
+
+    def __iter__(self):
+        for index in self.cells:
+            yield divmod(index, self.width)
 
 
 class Sentence():
@@ -89,14 +366,147 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cells are stored as the bits of an integer mask, relative to an anchor
+    at the sentence's lowest row and column, with `stride` bits per row.
+    Masks stay as small as the sentence's extent, and subset tests and
+    differences between sentences are single bitwise operations.
     """
 
+    # Bits per row of a mask, unless a sentence spans more columns. Two
+    # sentences sharing a cell and spanning at most half as many columns,
+    # as those of the AI do, fit in a common frame without encoding again
+    STRIDE = 8
+
+    __slots__ = ("i", "j", "stride", "width", "mask", "count")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        cells = list(cells)
+        self.i = min((i for i, _ in cells), default=0)
+        self.j = min((j for _, j in cells), default=0)
+        self.width = max((j for _, j in cells), default=self.j - 1) - self.j + 1
+        self.stride = max(Sentence.STRIDE, self.width)
+        self.mask = Sentence.encode(cells, self.i, self.j, self.stride)
         self.count = count
 
+    @staticmethod
+    def encode(cells, i, j, stride):
+        """
+        Returns the mask of `cells`, relative to an anchor at row `i` and
+        column `j`, with `stride` bits per row.
+        """
+        mask = 0
+        for cell_i, cell_j in cells:
+            mask |= 1 << ((cell_i - i) * stride + cell_j - j)
+        return mask
+
+    @staticmethod
+    def from_mask(i, j, stride, mask, count):
+        """
+        Returns a new sentence about the cells set in `mask`, relative to
+        an anchor at row `i` and column `j`, with `stride` bits per row.
+        """
+        sentence = Sentence((), count)
+        sentence.i, sentence.j, sentence.stride = i, j, stride
+        sentence.mask = mask
+        sentence.normalize()
+        return sentence
+
+    def normalize(self):
+        """
+        Moves the anchor to the lowest row and column of the cells left, and
+        sets the stride from the columns they span, so that equal sets of
+        cells always have equal keys.
+        """
+        if not self.mask:
+            self.i = self.j = self.width = 0
+            self.stride = Sentence.STRIDE
+            return
+        row = (1 << self.stride) - 1
+        while not self.mask & row:
+            self.mask >>= self.stride
+            self.i += 1
+
+        # Columns used by any row, folded into one row
+        columns = 0
+        mask = self.mask
+        while mask:
+            columns |= mask & row
+            mask >>= self.stride
+        shift = (columns & -columns).bit_length() - 1
+        self.mask >>= shift
+        self.j += shift
+        self.width = (columns >> shift).bit_length()
+
+        # Only sentences wider than `STRIDE` columns change stride
+        stride = max(Sentence.STRIDE, self.width)
+        if stride != self.stride:
+            cells = self.cells
+            self.stride = stride
+            self.mask = Sentence.encode(cells, self.i, self.j, stride)
+
+    @property
+    def key(self):
+        """
+        Anchor and mask, which identify the set of cells of the sentence.
+        """
+        return (self.i, self.j, self.mask)
+
+    def bit(self, cell):
+        """
+        Returns the mask with only the bit of `cell` set, or 0 if `cell`
+        is outside the frame of the sentence.
+        """
+        di = cell[0] - self.i
+        dj = cell[1] - self.j
+        if di < 0 or not 0 <= dj < self.stride:
+            return 0
+        return 1 << (di * self.stride + dj)
+
+    def align(self, other):
+        """
+        Returns the anchor row and column and the stride of a frame holding
+        this sentence and `other`, and the masks of both relative to it.
+        """
+        if not other.mask:
+            return self.i, self.j, self.stride, self.mask, 0
+        if not self.mask:
+            return other.i, other.j, other.stride, 0, other.mask
+        i = min(self.i, other.i)
+        j = min(self.j, other.j)
+        width = max(self.j + self.width, other.j + other.width) - j
+        stride = self.stride
+        if other.stride == stride and width <= stride:
+            return (
+                i, j, stride,
+                self.mask << ((self.i - i) * stride + self.j - j),
+                other.mask << ((other.i - i) * stride + other.j - j)
+            )
+
+        # Otherwise encode both sentences again in a frame wide enough
+        stride = max(self.stride, other.stride, width)
+        return (
+            i, j, stride,
+            Sentence.encode(self.cells, i, j, stride),
+            Sentence.encode(other.cells, i, j, stride)
+        )
+
+    @property
+    def cells(self):
+        cells = set()
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            di, dj = divmod(low.bit_length() - 1, self.stride)
+            cells.add((self.i + di, self.j + dj))
+            mask ^= low
+        return cells
+
+    def __len__(self):
+        return self.mask.bit_count()
+
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        return self.key == other.key and self.count == other.count
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
@@ -106,14 +516,16 @@ class Sentence():
         Returns the set of all cells in self.cells known to be mines.
         """
         # Only if the count matches the number of cells do we know they are all mines, otherwise none are known
-        return set(self.cells) if self.count == len(self.cells) else set()
+        if self.count and self.count == len(self):
+            return self.cells
+        return EMPTY
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
         # Only if the count is zero do we know all cells are safe, otherwise none are known
-        return set(self.cells) if self.count == 0 else set()
+        return self.cells if self.count == 0 and self.mask else EMPTY
 
     def mark_mine(self, cell):
         """
@@ -121,9 +533,11 @@ class Sentence():
         a cell is known to be a mine.
         """
         # If this cell is present, remove it and decrease the count for the others
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self.bit(cell)
+        if self.mask & bit:
+            self.mask ^= bit
             self.count -= 1
+            self.normalize()
 
     def mark_safe(self, cell):
         """
@@ -131,8 +545,10 @@ class Sentence():
         a cell is known to be safe.
         """
         # Remove this cell if it is present, but keep the count the same for the others
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = self.bit(cell)
+        if self.mask & bit:
+            self.mask ^= bit
+            self.normalize()
 
 
 class MinesweeperAI():
@@ -140,21 +556,79 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mine_count=None,
+                 inference_limit=1000, enumeration_limit=4096, samples=200):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Number of mines on the board, if known, to estimate the chance
+        # that cells no sentence mentions are mines
+        self.mine_count = mine_count
+
+        # Most sentences inferred by subset reasoning after a single move
+        self.inference_limit = inference_limit
+
+        # Frontier components with more mine configurations than
+        # `enumeration_limit` have their mine probabilities estimated from
+        # `samples` configurations drawn uniformly
+        self.enumeration_limit = enumeration_limit
+        self.samples = samples
+
+        # Mine probabilities of the frontier components enumerated by the last
+        # probable move, keyed by their sentences
+        self.probability_cache = dict()
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
+        # Cells that have not been clicked on and are not known to be mines
+        self.unrevealed = CellPool(height, width)
+
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells that have not been clicked on yet
+        self.safe_moves = set()
+
+        # Sentences about the game known to be true, keyed by their anchor and
+        # mask of cells, so that a duplicate sentence is never stored twice
+        self.knowledge = dict()
+
+        # Sentences that mention each cell, by their `id`, so that marking
+        # a cell changes sentences in place without decoding their masks
+        self.index = dict()
+
+        # Sentences added or changed since their conclusions were last drawn
+        self.changed = deque()
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        the same cells are already covered by another sentence.
+        """
+        key = sentence.key
+        if not sentence.mask or key in self.knowledge:
+            return
+        self.knowledge[key] = sentence
+        for cell in sentence.cells:
+            self.index.setdefault(cell, dict())[id(sentence)] = sentence
+        self.changed.append(sentence)
+
+    def update_sentence(self, sentence):
+        """
+        Stores a sentence of the knowledge base again after one of its cells
+        was marked, dropping it if it became empty or a duplicate.
+        """
+        key = sentence.key
+        if key in self.knowledge:
+            for cell in sentence.cells:
+                del self.index[cell][id(sentence)]
+        elif sentence.mask:
+            self.knowledge[key] = sentence
+            self.changed.append(sentence)
 
     def mark_mine(self, cell):
         """
@@ -162,8 +636,13 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        self.unrevealed.discard(cell)
+
+        # Only the sentences mentioning the cell change, and are stored again
+        for sentence in self.index.pop(cell, dict()).values():
+            del self.knowledge[sentence.key]
             sentence.mark_mine(cell)
+            self.update_sentence(sentence)
 
     def mark_safe(self, cell):
         """
@@ -171,8 +650,65 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        for sentence in self.index.pop(cell, dict()).values():
+            del self.knowledge[sentence.key]
             sentence.mark_safe(cell)
+            self.update_sentence(sentence)
+
+    def infer_subsets(self, sentence):
+        """
+        Adds the sentences inferred from `sentence` and each sentence sharing
+        a cell with it, where the cells of one are a subset of the other's:
+        the remaining cells hold the difference of their counts.
+        Returns the number of sentences inferred.
+        """
+        others = dict()
+        for cell in sentence.cells:
+            others.update(self.index[cell])
+        del others[id(sentence)]
+
+        inferred = []
+        for other in others.values():
+            i, j, stride, mask, other_mask = sentence.align(other)
+            shared = mask & other_mask
+            if shared == other_mask:
+                inferred.append(Sentence.from_mask(
+                    i, j, stride, mask ^ shared, sentence.count - other.count
+                ))
+            elif shared == mask:
+                inferred.append(Sentence.from_mask(
+                    i, j, stride, other_mask ^ shared,
+                    other.count - sentence.count
+                ))
+        for new_sentence in inferred:
+            self.add_sentence(new_sentence)
+        return len(inferred)
+
+    def propagate(self):
+        """
+        Marks the cells that changed sentences show to be safe or mines, and
+        infers new sentences from subsets, until no sentence is left with
+        a conclusion to draw. Subset inference stops once `inference_limit`
+        sentences have been inferred, so that every move takes bounded time.
+        """
+        inferences = 0
+        while self.changed:
+            sentence = self.changed.popleft()
+
+            # Skip sentences that changed again, or were dropped, since
+            if self.knowledge.get(sentence.key) is not sentence:
+                continue
+            for safe_cell in sentence.known_safes():
+                self.mark_safe(safe_cell)
+            for mine_cell in sentence.known_mines():
+                self.mark_mine(mine_cell)
+
+            # Compare sentences that are left against their neighbors only
+            if self.knowledge.get(sentence.key) is sentence \
+                    and inferences < self.inference_limit:
+                inferences += self.infer_subsets(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -189,35 +725,40 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
-        self.moves_made.add(cell)  # 1)
-        self.mark_safe(cell)  # 2)
+        self.add_knowledge_batch([(cell, count)])
+
+    def add_knowledge_batch(self, revealed):
+        """
+        Adds the knowledge of many revealed cells at once, given a list of
+        (cell, count) pairs such as the one returned by `Minesweeper.reveal`.
+        Every cell is marked before any sentence is added, and conclusions
+        are drawn in a single pass once all sentences are in.
+        """
+        for cell, _ in revealed:
+            self.moves_made.add(cell)  # 1)
+            self.unrevealed.discard(cell)
+            self.safe_moves.discard(cell)
+            self.mark_safe(cell)  # 2)
 
         # 3) Loop through all neighbor cells, and add them to the knew knowledge if they are not already known to be safe or mines
-        cells = set()
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                if (0 <= i < self.height and 0 <= j < self.width and (i, j) != cell):
-                    # Only add the new cell if it is not already known to be safe or a mine
-                    new_cell = (i, j)
-                    if new_cell not in self.mines and new_cell not in self.safes:
-                        cells.add((i, j))
-        new_sentence = Sentence(cells, count)
-        self.knowledge.append(new_sentence)
-
-        # 4) Loop through all knowledge and mark any known safes or mines within the AI
-        for sentence in self.knowledge:
-            for safe_cell in sentence.known_safes():
-                self.mark_safe(safe_cell)
-            for mine_cell in sentence.known_mines():
-                self.mark_mine(mine_cell)
+        for cell, count in revealed:
+            cells = set()
+            for i in range(cell[0] - 1, cell[0] + 2):
+                for j in range(cell[1] - 1, cell[1] + 2):
+                    if (0 <= i < self.height and 0 <= j < self.width and (i, j) != cell):
+                        new_cell = (i, j)
+                        # Known mines are left out, and taken off the count
+                        if new_cell in self.mines:
+                            count -= 1
+                        elif new_cell not in self.safes:
+                            cells.add(new_cell)
+            self.add_sentence(Sentence(cells, count))
+
+        # 4) and 5) Draw conclusions from the sentences that changed, which
+        # marks cells in only the sentences that mention them, and infer
+        # sentences from the ones that share cells with them
+        self.propagate()
 
-        # 5) Loop through all knowledge and if there are any new safe or mines, update the other sentences
-        for sentence in self.knowledge:
-            for safe in self.safes:
-                sentence.mark_safe(safe)
-            for mine in self.mines:
-                sentence.mark_mine(mine)
-  
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -227,11 +768,14 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        available_safes = self.safes - self.moves_made
-        try:
-            return available_safes.pop()
-        except:
+        # Safe moves are kept up to date as cells are marked and clicked on.
+        # Popping is amortized constant time, unlike iterating over a set
+        # that many cells were removed from, so pop a cell and put it back
+        if not self.safe_moves:
             return None
+        cell = self.safe_moves.pop()
+        self.safe_moves.add(cell)
+        return cell
 
     def make_random_move(self):
         """
@@ -239,10 +783,85 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        Returns None if there is no such cell.
         """
-        # Loop until a valid random cell is found
-        while True:
-            cell = random.randrange(self.height), random.randrange(self.width)
-            if cell not in self.moves_made and cell not in self.mines:
-                return cell
+        # Draw from the pool of such cells, which is empty once none are left
+        return self.unrevealed.sample()
 
+    def component_probabilities(self, cells, sentences):
+        """
+        Returns a dict from each cell of a frontier component to the fraction
+        of the mine configurations agreeing with `sentences` in which it is
+        a mine. Enumeration stops after `enumeration_limit` configurations,
+        and components with more are sampled instead.
+        """
+        configurations = list(itertools.islice(
+            mine_configurations(cells, sentences), self.enumeration_limit + 1
+        ))
+        if len(configurations) > self.enumeration_limit:
+            configurations = sample_configurations(
+                cells, sentences, self.samples
+            )
+        mines = [0] * len(cells)
+        total = 0
+        for values in configurations:
+            total += 1
+            for k, mine in enumerate(values):
+                if mine:
+                    mines[k] += 1
+        return {cell: mines[k] / total for k, cell in enumerate(cells)}
+
+    def mine_probabilities(self):
+        """
+        Returns a dict from each cell that has not been chosen, and is not
+        known to be a mine, to the probability that it is a mine.
+
+        The frontier, cells mentioned by some sentence, is split into
+        components that share no sentence, and each component is solved on its
+        own. Every other cell gets the density of the mines left over.
+        """
+        probabilities = dict()
+        cache = dict()
+        for cells, sentences in frontier_components(self.knowledge.values()):
+            key = frozenset(
+                (sentence.key, sentence.count) for sentence in sentences
+            )
+            if key in self.probability_cache:
+                cache[key] = self.probability_cache[key]
+            else:
+                cache[key] = self.component_probabilities(cells, sentences)
+            probabilities.update(cache[key])
+
+        # Only keep the components of the current frontier
+        self.probability_cache = cache
+
+        # Spread the mines not expected on the frontier over the other cells
+        others = [
+            cell for cell in self.unrevealed if cell not in probabilities
+        ]
+        expected = sum(probabilities.values())
+        if self.mine_count is not None and others:
+            density = (self.mine_count - len(self.mines) - expected) / len(others)
+        elif probabilities:
+            density = expected / len(probabilities)
+        else:
+            density = 0.5
+        density = min(max(density, 0), 1)
+        for cell in others:
+            probabilities[cell] = 0 if cell in self.safes else density
+        return probabilities
+
+    def make_probable_move(self):
+        """
+        Returns the move on the Minesweeper board least likely to be a mine,
+        among cells that have not already been chosen and are not known to
+        be mines, or None if there is no such cell. Ties are broken randomly.
+        """
+        probabilities = self.mine_probabilities()
+        if not probabilities:
+            return None
+        lowest = min(probabilities.values())
+        return random.choice([
+            cell for cell, probability in probabilities.items()
+            if probability == lowest
+        ])
@@ -0,0 +1,174 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Ways for the AI to choose a move when no safe move is known
+STRATEGIES = ["random", "probable"]
+
+# Percentiles of per-move latency to report
+PERCENTILES = [50, 90, 99]
+
+
+def play(height, width, mines, seed, strategy="random", deferred=False,
+         flood=False):
+    """
+    Play one full game of Minesweeper with the AI, without a display.
+    If `deferred` is True, mines are placed after the first click, away
+    from it. If `flood` is True, clicking a cell with no nearby mines
+    reveals the region around it, which the AI takes in as one batch.
+    Return a dict describing the game, including the time in seconds the AI
+    spent on each move, choosing it and adding the knowledge it revealed.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines, deferred=deferred)
+    ai = MinesweeperAI(height=height, width=width, mine_count=mines)
+    guess = ai.make_probable_move if strategy == "probable" else ai.make_random_move
+
+    latencies = []
+    guesses = 0
+    won = False
+    start = time.perf_counter()
+    while True:
+        move_start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = guess()
+            guesses += 1
+        if move is None or game.is_mine(move):
+            latencies.append(time.perf_counter() - move_start)
+            break
+        if flood:
+            ai.add_knowledge_batch(game.reveal(move))
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - move_start)
+
+        # The game is won once every safe cell has been revealed
+        if len(ai.moves_made) == height * width - mines:
+            won = True
+            break
+
+    return {
+        "seed": seed,
+        "won": won,
+        "moves": len(latencies),
+        "guesses": guesses,
+        "time": time.perf_counter() - start,
+        "latencies": latencies,
+    }
+
+
+def percentile(values, p):
+    """
+    Return the `p`th percentile of a sorted list of values, by the
+    nearest-rank method.
+    """
+    if not values:
+        return None
+    rank = max(1, -(-p * len(values) // 100))
+    return values[rank - 1]
+
+
+def simulate(games, height, width, mines, strategy="random", workers=None, seed=0,
+             deferred=False, flood=False):
+    """
+    Play `games` games over `workers` processes, seeding game `k` with
+    `seed + k`, and return a summary of the results.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            play,
+            [height] * games, [width] * games, [mines] * games,
+            range(seed, seed + games), [strategy] * games,
+            [deferred] * games, [flood] * games,
+            chunksize=max(1, games // (4 * (workers or 1)))
+        ))
+
+    latencies = sorted(
+        latency for result in results for latency in result["latencies"]
+    )
+    latency = {f"p{p}": percentile(latencies, p) for p in PERCENTILES}
+    latency["max"] = latencies[-1] if latencies else None
+
+    wins = sum(result["won"] for result in results)
+    moves = sum(result["moves"] for result in results)
+    elapsed = sum(result["time"] for result in results)
+    return {
+        "games": games,
+        "height": height,
+        "width": width,
+        "mines": mines,
+        "strategy": strategy,
+        "deferred": deferred,
+        "flood": flood,
+        "wins": wins,
+        "win_rate": wins / games if games else None,
+        "moves": moves,
+        "guesses": sum(result["guesses"] for result in results),
+        "moves_per_second": moves / elapsed if elapsed else None,
+        "latency": latency,
+    }
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(
+        description="Play many Minesweeper games with the AI, without a display."
+    )
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    mine_options = parser.add_mutually_exclusive_group()
+    mine_options.add_argument("--mines", type=int, help="number of mines (default 8)")
+    mine_options.add_argument(
+        "--density", type=float, help="fraction of cells holding mines"
+    )
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="random",
+        help="how to move when no safe move is known"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="number of processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--safe-start", action="store_true",
+        help="place mines after the first click, so that it is always safe"
+    )
+    parser.add_argument(
+        "--flood", action="store_true",
+        help="reveal the region around cells with no nearby mines in one move"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--output", help="write the summary to this JSON file")
+    args = parser.parse_args()
+
+    if args.density is not None:
+        mines = round(args.density * args.height * args.width)
+    else:
+        mines = args.mines if args.mines is not None else 8
+    if not 0 <= mines < args.height * args.width:
+        parser.error("there must be at least one cell without a mine")
+
+    summary = simulate(
+        args.games, args.height, args.width, mines,
+        strategy=args.strategy, workers=args.workers, seed=args.seed,
+        deferred=args.safe_start, flood=args.flood
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
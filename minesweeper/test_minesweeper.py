@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from minesweeper import (
+    MinesweeperAI, Sentence, frontier_components, mine_configurations,
+    sample_configurations
+)
+
+
+class ProbabilityTests(unittest.TestCase):
+
+    def probabilities(self, sentences, **limits):
+        """
+        Returns the mine probabilities of the single frontier component
+        of `sentences`, as computed by an AI with the given limits.
+        """
+        ai = MinesweeperAI(**limits)
+        (cells, sentences), = frontier_components(sentences)
+        return ai.component_probabilities(cells, sentences)
+
+    def assertSampledLikeEnumerated(self, sentences):
+        random.seed(0)
+        enumerated = self.probabilities(sentences)
+        sampled = self.probabilities(
+            sentences, enumeration_limit=0, samples=20000
+        )
+        self.assertEqual(enumerated.keys(), sampled.keys())
+        for cell in enumerated:
+            self.assertAlmostEqual(enumerated[cell], sampled[cell], delta=0.02)
+
+    def test_single_sentence(self):
+        sentence = Sentence({(0, 0), (0, 1), (0, 2), (0, 3)}, 1)
+        probabilities = self.probabilities([sentence])
+        self.assertEqual(set(probabilities.values()), {0.25})
+        self.assertSampledLikeEnumerated([sentence])
+
+    def test_overlapping_sentences(self):
+        sentences = [
+            Sentence({(1, 0), (1, 1), (1, 2)}, 1),
+            Sentence({(1, 1), (1, 2), (1, 3)}, 2),
+            Sentence({(1, 2), (1, 3), (0, 3), (0, 4)}, 2),
+        ]
+        self.assertSampledLikeEnumerated(sentences)
+
+    def test_samples_agree_with_sentences(self):
+        sentences = [
+            Sentence({(0, 0), (0, 1), (1, 0)}, 1),
+            Sentence({(0, 1), (1, 0), (1, 1), (0, 2)}, 2),
+        ]
+        (cells, sentences), = frontier_components(sentences)
+        configurations = set(mine_configurations(cells, sentences))
+        for values in sample_configurations(cells, sentences, 100):
+            self.assertIn(values, configurations)
+
+    def test_no_configuration(self):
+        sentences = [
+            Sentence({(0, 0), (0, 1)}, 2),
+            Sentence({(0, 0), (0, 1), (0, 2)}, 1),
+        ]
+        (cells, sentences), = frontier_components(sentences)
+        self.assertEqual(sample_configurations(cells, sentences, 10), [])
+
+
+if __name__ == "__main__":
+    unittest.main()